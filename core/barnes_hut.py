@@ -0,0 +1,152 @@
+import numpy as np
+
+DEFAULT_THETA = 0.5
+DEFAULT_LEAF_SIZE = 8
+DN_CHUNK_SIZE = 1 << 15  # DNs traversed together, bounds the frontier size
+
+
+class BarnesHutTree:
+    def __init__(self, positions, weights, leaf_size=DEFAULT_LEAF_SIZE):
+        """
+        Quadtree over PMNs. Every cell aggregates the preference weights of its PMNs
+        (so a DN's charge towards the whole cell is one dot product) and places them
+        at their charge-weighted centre, so distant cells act as a single pseudo-PMN.
+
+        :param positions: (P, 2) array of PMN positions.
+        :param weights: (P, A) array of PMN preference weights (ChargeMatrix rows).
+        :param leaf_size: Maximum number of PMNs in a leaf cell.
+        """
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.weights = np.asarray(weights, dtype=float).reshape(len(self.positions), -1)
+        self.leaf_size = max(1, int(leaf_size))
+        self.build()
+
+    def build(self):
+        """
+        Split the PMNs into quadrants until each leaf holds at most leaf_size PMNs.
+        PMNs are permuted so that every cell covers a contiguous range of self.order.
+        """
+        count = len(self.positions)
+        self.order = np.arange(count)
+        starts, ends, widths, children = [], [], [], []
+        if count:
+            low = self.positions.min(axis=0)
+            width = max(float((self.positions.max(axis=0) - low).max()), 1e-9)
+            stack = [(0, count, low + width / 2, width, -1, 0)]
+        else:
+            stack = []
+
+        while stack:
+            start, end, box_center, width, parent, quadrant = stack.pop()
+            cell = len(starts)
+            starts.append(start)
+            ends.append(end)
+            widths.append(width)
+            children.append([-1, -1, -1, -1])
+            if parent >= 0:
+                children[parent][quadrant] = cell
+
+            if end - start <= self.leaf_size or width < 1e-6:
+                continue
+
+            members = self.order[start:end]
+            quadrants = (
+                (self.positions[members, 0] >= box_center[0]).astype(int)
+                + 2 * (self.positions[members, 1] >= box_center[1]).astype(int)
+            )
+            sorting = np.argsort(quadrants, kind="stable")
+            self.order[start:end] = members[sorting]
+            bounds = start + np.searchsorted(quadrants[sorting], np.arange(5))
+            for child in range(4):
+                if bounds[child + 1] > bounds[child]:
+                    offset = np.array([child % 2, child // 2]) - 0.5
+                    stack.append((
+                        bounds[child], bounds[child + 1], box_center + offset * width / 2,
+                        width / 2, cell, child
+                    ))
+
+        self.starts = np.array(starts, dtype=int)
+        self.ends = np.array(ends, dtype=int)
+        self.widths = np.array(widths, dtype=float)
+        self.children = np.array(children, dtype=int).reshape(-1, 4)
+        self.is_leaf = (self.children < 0).all(axis=1)
+
+        # Aggregates per cell from prefix sums over the permuted PMNs
+        ordered_weights = self.weights[self.order]
+        strength = np.abs(ordered_weights).sum(axis=1)
+        strength = np.where(strength > 0, strength, 1e-12)  # Fall back to the geometric centre
+        weight_prefix = np.vstack([np.zeros((1, self.weights.shape[1])), np.cumsum(ordered_weights, axis=0)])
+        moment_prefix = np.vstack([np.zeros((1, 2)), np.cumsum(self.positions[self.order] * strength[:, None], axis=0)])
+        strength_prefix = np.concatenate([[0.0], np.cumsum(strength)])
+
+        self.cell_weights = weight_prefix[self.ends] - weight_prefix[self.starts]
+        cell_strength = strength_prefix[self.ends] - strength_prefix[self.starts]
+        self.centers = (moment_prefix[self.ends] - moment_prefix[self.starts]) / cell_strength[:, None]
+
+    def compute_forces(self, positions, features, gravitational_constant, softening, theta=DEFAULT_THETA):
+        """
+        Approximate the summed softened 1.9-power pull of all PMNs on each DN.
+        A cell is treated as one pseudo-PMN when width / distance < theta;
+        theta = 0 opens every cell and gives the exact sum.
+
+        :param positions: (N, 2) array of DN positions.
+        :param features: (N, A) array of DN features (ChargeMatrix rows).
+        :return: (N, 2) array of total forces, before clamping.
+        """
+        total_force = np.zeros((len(positions), 2))
+        if not len(self.starts):
+            return total_force
+        for start in range(0, len(positions), DN_CHUNK_SIZE):
+            stop = start + DN_CHUNK_SIZE
+            total_force[start:stop] = self.traverse(
+                positions[start:stop], features[start:stop], gravitational_constant, softening, theta
+            )
+        return total_force
+
+    def traverse(self, positions, features, gravitational_constant, softening, theta):
+        """
+        Walk the tree for all DNs at once, one level of (DN, cell) pairs per iteration.
+        """
+        count = len(positions)
+        force = np.zeros((count, 2))
+        dns = np.arange(count)
+        cells = np.zeros(count, dtype=int)
+
+        def accumulate(dn_index, charge, r_vector):
+            distance = np.sqrt((r_vector * r_vector).sum(axis=1)) + softening
+            scale = (gravitational_constant * charge) / (distance ** 1.9)
+            force[:, 0] += np.bincount(dn_index, weights=scale * r_vector[:, 0], minlength=count)
+            force[:, 1] += np.bincount(dn_index, weights=scale * r_vector[:, 1], minlength=count)
+
+        while len(dns):
+            r_vector = self.centers[cells] - positions[dns]
+            distance = np.sqrt((r_vector * r_vector).sum(axis=1))
+            far = self.widths[cells] < theta * distance
+
+            # Distant cells act as a single pseudo-PMN
+            far_dns, far_cells = dns[far], cells[far]
+            accumulate(far_dns, (features[far_dns] * self.cell_weights[far_cells]).sum(axis=1), r_vector[far])
+
+            # Near leaves are summed PMN by PMN
+            near_leaf = ~far & self.is_leaf[cells]
+            leaf_dns, leaf_cells = dns[near_leaf], cells[near_leaf]
+            sizes = self.ends[leaf_cells] - self.starts[leaf_cells]
+            pair_dns = np.repeat(leaf_dns, sizes)
+            offsets = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            pmns = self.order[np.repeat(self.starts[leaf_cells], sizes) + offsets]
+            accumulate(
+                pair_dns,
+                (features[pair_dns] * self.weights[pmns]).sum(axis=1),
+                self.positions[pmns] - positions[pair_dns]
+            )
+
+            # Near internal cells are opened
+            near_internal = ~far & ~self.is_leaf[cells]
+            child_cells = self.children[cells[near_internal]]
+            open_dns = np.repeat(dns[near_internal], 4)
+            child_cells = child_cells.ravel()
+            present = child_cells >= 0
+            dns, cells = open_dns[present], child_cells[present]
+
+        return force
+
@@ -0,0 +1,172 @@
+import numpy as np
+
+
+class ChargeMatrix:
+    def __init__(self, config):
+        """
+        Cache of normalized DN attributes (N x A) and PMN preferences (P x A).
+        The gravitational charge of every DN relative to every PMN is their product.
+        Rows live in NodeStore columns, so they follow their node through the store.
+
+        A row is built once per node. Change DN attributes and PMN preferences through
+        SimulationController.set_dn_attributes / set_pmn_preferences, which invalidate
+        the row. Every row is rebuilt when the attribute axis, ranges or inversions of
+        the config change (SimulationConfig.update, or assigning its compiled fields).
+
+        :param config: SimulationConfig instance.
+        """
+        self.store = None
+        self.config = config
+        self.compile()
+
+    def compile(self):
+        """
+        Take the attribute axis, ranges and inversions from the config. Preference names
+        added by add_attributes are registered again as their PMN rows are rebuilt.
+        """
+        config = self.config
+        self.attribute_names = list(config.attribute_names)
+        self.attribute_index = dict(config.attribute_index)
+
+        # Normalize only when the range is not degenerate, as calculate_gravitational_charge does
+        ranged = config.maxs != config.mins
+        self.offsets = np.where(ranged, config.mins, 0.0)
+        self.spans = np.where(ranged, config.maxs - config.mins, 1.0)
+        self.invert_mask = np.array([name in config.invert_attributes for name in self.attribute_names], dtype=bool)
+        self.compiled_from = (
+            list(config.attribute_names), config.mins.copy(), config.maxs.copy(), set(config.invert_attributes)
+        )
+
+    def config_changed(self):
+        """
+        Whether the config's attribute axis, ranges or inversions differ from the compiled ones.
+        """
+        names, mins, maxs, invert_attributes = self.compiled_from
+        config = self.config
+        return (
+            names != config.attribute_names or not np.array_equal(mins, config.mins)
+            or not np.array_equal(maxs, config.maxs) or invert_attributes != config.invert_attributes
+        )
+
+    def bind(self, store):
+        """
+        Attach to a NodeStore and allocate the row columns in it.
+        """
+        self.store = store
+        self.allocate_columns()
+
+    def allocate_columns(self):
+        """
+        (Re)create the row columns: DN slots hold features, PMN slots hold preference weights.
+        Every row starts out stale and is rebuilt on the next charges() call.
+        """
+        self.store.register_column("charge_rows", (len(self.attribute_names),), float, 0.0)
+        self.store.register_column("charge_valid", (), bool, False)
+
+    def add_attributes(self, names):
+        """
+        Extend the attribute axis with preference names that the config does not list.
+        They are used as raw values, inverted if listed in invert_attributes.
+
+        :param names: Attribute names to register.
+        :return: True if the axis grew.
+        """
+        new_names = [name for name in names if name not in self.attribute_index]
+        if not new_names:
+            return False
+
+        for name in dict.fromkeys(new_names):
+            self.attribute_index[name] = len(self.attribute_names)
+            self.attribute_names.append(name)
+            self.offsets = np.append(self.offsets, 0.0)
+            self.spans = np.append(self.spans, 1.0)
+            self.invert_mask = np.append(self.invert_mask, name in self.config.invert_attributes)
+        return True
+
+    def build_dn_features(self, dns):
+        """
+        Normalize and invert the attributes of the given DNs.
+
+        :param dns: Sequence of DynamicNodes.
+        :return: (len(dns), A) feature matrix.
+        """
+        values = np.array(
+            [[dn.attributes.get(name, 0) for name in self.attribute_names] for dn in dns],
+            dtype=float
+        ).reshape(len(dns), len(self.attribute_names))
+        features = (values - self.offsets) / self.spans
+        features[:, self.invert_mask] = 1.0 - features[:, self.invert_mask]
+        return features
+
+    def build_pmn_weights(self, pmns):
+        """
+        Lay out the preference weights of the given PMNs along the attribute axis.
+
+        :param pmns: Sequence of PrimaryMassNodes.
+        :return: (len(pmns), A) weight matrix.
+        """
+        weights = np.zeros((len(pmns), len(self.attribute_names)))
+        for row, pmn in enumerate(pmns):
+            for attribute, weight in pmn.attributes.get("preferences", {}).items():
+                weights[row, self.attribute_index[attribute]] = weight
+        return weights
+
+    def invalidate_dn(self, dn):
+        """
+        Mark the row of a DN whose attributes changed; it is rebuilt on the next charges() call.
+        """
+        if self.store is not None and dn.store is self.store:
+            self.store.columns["charge_valid"][dn.slot] = False
+
+    def invalidate_pmn(self, pmn):
+        """
+        Mark the row of a PMN whose preferences changed; it is rebuilt on the next charges() call.
+        """
+        self.invalidate_dn(pmn)
+
+    def refresh(self, slots, builder):
+        """
+        Rebuild the stale rows among the given slots.
+        """
+        valid = self.store.columns["charge_valid"]
+        stale = slots[~valid[slots]]
+        if len(stale):
+            nodes = [self.store.handles[slot] for slot in stale]
+            self.store.columns["charge_rows"][stale] = builder(nodes)
+            valid[stale] = True
+
+    def rows(self, store, dn_slots, pmn_slots):
+        """
+        Up-to-date DN feature rows and PMN weight rows for the given slots.
+
+        :param store: NodeStore holding the nodes.
+        :param dn_slots: Slots of the DNs.
+        :param pmn_slots: Slots of the PMNs.
+        :return: ((len(dn_slots), A) features, (len(pmn_slots), A) weights).
+        """
+        if store is not self.store or self.config_changed():
+            self.compile()
+            self.bind(store)
+
+        valid = store.columns["charge_valid"]
+        stale_pmns = [store.handles[slot] for slot in pmn_slots[~valid[pmn_slots]]]
+        if self.add_attributes(name for pmn in stale_pmns for name in pmn.attributes.get("preferences", {})):
+            self.allocate_columns()
+
+        self.refresh(pmn_slots, self.build_pmn_weights)
+        self.refresh(dn_slots, self.build_dn_features)
+
+        rows = store.columns["charge_rows"]
+        return rows[dn_slots], rows[pmn_slots]
+
+    def charges(self, store, dn_slots, pmn_slots):
+        """
+        Gravitational charge of every DN relative to every PMN.
+
+        :param store: NodeStore holding the nodes.
+        :param dn_slots: Slots of the DNs (rows of the result).
+        :param pmn_slots: Slots of the PMNs (columns of the result).
+        :return: (len(dn_slots), len(pmn_slots)) charge matrix, computed as a single matrix multiply.
+        """
+        features, weights = self.rows(store, dn_slots, pmn_slots)
+        return features @ weights.T
@@ -0,0 +1,159 @@
+import numpy as np
+import json
+
+DEFAULT_SPEED_MULTIPLIER = 1
+DEFAULT_GRAVITATIONAL_CONSTANT = 1.2  # Scaled by the speed multiplier
+DEFAULT_SOFTENING = 5
+DEFAULT_MAX_FORCE = 15
+DEFAULT_MAX_VELOCITY = 20
+DEFAULT_DAMPING = 0.998
+DEFAULT_TRAIL_LENGTH = 15
+DEFAULT_PROXIMITY_THRESHOLD = 20  # Distance in pixels for merging
+DEFAULT_FORCE_MODE = "exact"  # "exact" or "barnes_hut"
+DEFAULT_BARNES_HUT_THETA = 0.5  # Opening angle: cell width / distance below which a cell is one pseudo-PMN
+DEFAULT_BARNES_HUT_LEAF_SIZE = 8
+DEFAULT_BARNES_HUT_MIN_PMNS = 64  # Below this the exact kernel is cheaper than building a tree
+DEFAULT_INTEGRATOR = "euler"  # "euler" (kick then drift, as before) or "leapfrog" (drift-kick-drift)
+DEFAULT_SUBSTEPS = 1  # Integration steps per simulation tick, each advancing 1 / substeps of a tick
+DEFAULT_COLLISION_MODE = "jacobi"  # "jacobi" (fixed passes over all contacts) or "sequential" (exact i < j order, slow in dense clusters)
+DEFAULT_COLLISION_ITERATIONS = 2  # Jacobi passes per collision resolution
+DEFAULT_TICK_RATE = 20  # Simulation ticks per second of wall time in the GUI
+DEFAULT_MAX_FRAME_TICKS = 5  # Catch-up limit per frame; older backlog is dropped
+DEFAULT_WORLD_WIDTH = 800
+DEFAULT_WORLD_HEIGHT = 600
+DEFAULT_PROFILE_WINDOW = 1024  # Samples kept per profiled phase
+DEFAULT_PROFILE_DUMP_INTERVAL = 5.0  # Seconds between profile JSON dumps
+DEFAULT_SEED = None  # None: fresh entropy per run
+DEFAULT_LOD_THRESHOLD = 10000  # Above this many DNs the view draws a density map instead of single DNs
+DEFAULT_LOD_BIN_SIZE = 4  # Density map cell size in pixels
+DEFAULT_LOD_BLUR = 1  # Smoothing passes over the density map, 0 for none
+
+
+class SimulationConfig:
+    def __init__(self, data=None):
+        """
+        Config compiled once into aligned NumPy vectors and physics constants.
+        The engines hold a reference to one instance instead of re-reading the JSON dict.
+
+        :param data: Parsed config dictionary. Empty config if None.
+        """
+        self.update(data)
+
+    def update(self, data):
+        """
+        Recompile from a new config dictionary in place, so every engine holding this
+        instance sees the change. The ChargeMatrix rebuilds its rows on the next tick;
+        DN masses keep the values computed when the DNs were created.
+
+        :param data: Parsed config dictionary. Empty config if None.
+        """
+        self.data = data or {}
+
+        # Attribute vectors, aligned with attribute_names
+        attributes = self.data.get("attributes", {})
+        invert_attributes = set(self.data.get("invert_attributes", []))
+        self.attribute_names = list(attributes)
+        self.attribute_index = {name: i for i, name in enumerate(self.attribute_names)}
+        self.weights = np.array([settings["weight"] for settings in attributes.values()], dtype=float)
+        self.mins = np.array([settings.get("min", 0) for settings in attributes.values()], dtype=float)
+        self.maxs = np.array([settings.get("max", 1) for settings in attributes.values()], dtype=float)
+        self.has_range = np.array(
+            ["min" in settings and "max" in settings for settings in attributes.values()], dtype=bool
+        )
+        self.invert_mask = np.array([name in invert_attributes for name in self.attribute_names], dtype=bool)
+        self.invert_attributes = invert_attributes
+        self.total_weight = float(self.weights.sum())
+
+        # Physics constants
+        physics = self.data.get("physics", {})
+        self.speed_multiplier = physics.get("speed_multiplier", DEFAULT_SPEED_MULTIPLIER)
+        self.gravitational_constant = (
+            physics.get("gravitational_constant", DEFAULT_GRAVITATIONAL_CONSTANT) * self.speed_multiplier
+        )
+        self.softening = physics.get("softening", DEFAULT_SOFTENING)
+        self.max_force = physics.get("max_force", DEFAULT_MAX_FORCE)
+        self.max_velocity = physics.get("max_velocity", DEFAULT_MAX_VELOCITY)
+        self.damping = physics.get("damping", DEFAULT_DAMPING)
+        self.trail_length = int(physics.get("trail_length", DEFAULT_TRAIL_LENGTH))
+        self.force_mode = physics.get("force_mode", DEFAULT_FORCE_MODE)
+        self.barnes_hut_theta = physics.get("barnes_hut_theta", DEFAULT_BARNES_HUT_THETA)
+        self.barnes_hut_leaf_size = int(physics.get("barnes_hut_leaf_size", DEFAULT_BARNES_HUT_LEAF_SIZE))
+        self.barnes_hut_min_pmns = int(physics.get("barnes_hut_min_pmns", DEFAULT_BARNES_HUT_MIN_PMNS))
+        self.integrator = physics.get("integrator", DEFAULT_INTEGRATOR)
+        self.substeps = max(1, int(physics.get("substeps", DEFAULT_SUBSTEPS)))
+        self.collision_mode = physics.get("collision_mode", DEFAULT_COLLISION_MODE)
+        self.collision_iterations = max(1, int(physics.get("collision_iterations", DEFAULT_COLLISION_ITERATIONS)))
+        self.tick_rate = float(physics.get("tick_rate", DEFAULT_TICK_RATE))
+        self.max_frame_ticks = max(1, int(physics.get("max_frame_ticks", DEFAULT_MAX_FRAME_TICKS)))
+        self.world_width = physics.get("world_width", DEFAULT_WORLD_WIDTH)
+        self.world_height = physics.get("world_height", DEFAULT_WORLD_HEIGHT)
+
+        self.seed = self.data.get("seed", DEFAULT_SEED)  # Seeds the simulation's RandomStreams
+
+        # Profiling, from the optional "profiling" section
+        profiling = self.data.get("profiling", {})
+        self.profiling_enabled = bool(profiling.get("enabled", False))
+        self.profile_window = int(profiling.get("window", DEFAULT_PROFILE_WINDOW))
+        self.profile_dump_path = profiling.get("dump_path")
+        self.profile_dump_interval = float(profiling.get("dump_interval", DEFAULT_PROFILE_DUMP_INTERVAL))
+
+        # Level of detail of the view, from the optional "rendering" section
+        rendering = self.data.get("rendering", {})
+        self.lod_threshold = int(rendering.get("lod_threshold", DEFAULT_LOD_THRESHOLD))
+        self.lod_bin_size = max(1, int(rendering.get("lod_bin_size", DEFAULT_LOD_BIN_SIZE)))
+        self.lod_blur = max(0, int(rendering.get("lod_blur", DEFAULT_LOD_BLUR)))
+
+        self.proximity_threshold = self.data.get(
+            "proximity_threshold", physics.get("proximity_threshold", DEFAULT_PROXIMITY_THRESHOLD)
+        )
+
+    @classmethod
+    def load(cls, config_file):
+        """
+        Parse a config JSON file. Falls back to an empty config if the file is missing.
+
+        :param config_file: Path to the config JSON.
+        :return: SimulationConfig instance.
+        """
+        try:
+            with open(config_file, "r") as file:
+                return cls(json.load(file))
+        except FileNotFoundError:
+            print(f"[Warning] Config file not found: {config_file}. Using defaults.")
+            return cls()
+
+    def get(self, key, default=None):
+        """
+        Read a raw top-level config value (e.g. "mode", "processing").
+        """
+        return self.data.get(key, default)
+
+    def attribute_matrix(self, attribute_dicts):
+        """
+        Lay out attribute dictionaries along the config attribute axis.
+
+        :param attribute_dicts: Sequence of attribute dictionaries.
+        :return: (len(attribute_dicts), A) float matrix, 0 where an attribute is missing.
+        """
+        return np.array(
+            [[attributes.get(name, 0) for name in self.attribute_names] for attributes in attribute_dicts],
+            dtype=float
+        ).reshape(len(attribute_dicts), len(self.attribute_names))
+
+    def compute_masses(self, values):
+        """
+        Mass of each DN from its attribute row: clamped range normalization, weighting,
+        a base mass of 1 and amplified scaling, clamped to [5, 100].
+
+        :param values: (N, A) matrix from attribute_matrix.
+        :return: (N,) array of masses.
+        """
+        spans = np.where(self.has_range, self.maxs - self.mins, 1.0)
+        normalized = np.where(
+            self.has_range,
+            np.clip((values - self.mins) / spans, 0, 1),
+            values
+        )
+        mass = normalized @ self.weights
+        scaled_mass = 1 + (mass / max(1.0, self.total_weight) * 10.0)
+        return np.clip(scaled_mass, 5, 100)
@@ -0,0 +1,132 @@
+ADMITTED = "admitted"  # A PMN claimed a DN to fill its capacity
+STARTED = "started"  # A job for a DN entered a PMN's queue
+COMPLETED = "completed"  # A PMN finished a DN and absorbed its mass
+ABSORBED = "absorbed"  # A DN drifted within proximity of a PMN and was claimed by it
+EXPIRED = "expired"  # A DN's lifetime ran out
+EVENT_TYPES = (ADMITTED, STARTED, COMPLETED, ABSORBED, EXPIRED)
+
+NO_PMN = -1
+
+
+class SimulationEvent:
+    __slots__ = ("type", "tick", "pmn_id", "dn_id", "mass")
+
+    def __init__(self, event_type, tick, pmn_id, dn_id, mass):
+        """
+        One processing event.
+
+        :param event_type: One of EVENT_TYPES.
+        :param tick: Tick the event happened in.
+        :param pmn_id: Node ID of the PMN involved, NO_PMN if none.
+        :param dn_id: Node ID of the DN involved.
+        :param mass: Mass of the DN.
+        """
+        self.type = event_type
+        self.tick = tick
+        self.pmn_id = pmn_id
+        self.dn_id = dn_id
+        self.mass = mass
+
+    def __repr__(self):
+        return f"SimulationEvent({self.type}, tick={self.tick}, pmn={self.pmn_id}, dn={self.dn_id}, mass={self.mass:.2f})"
+
+
+class EventBus:
+    def __init__(self):
+        """
+        Collects simulation events during a tick and hands them to subscribers in one
+        batch per tick (possibly empty, so subscribers can keep time). Event types nobody
+        subscribed to are dropped at the emit call, before any event object is built, so
+        an unobserved bus costs a dict lookup.
+        """
+        self.subscribers = []  # (callback, set of event types)
+        self.listening = dict.fromkeys(EVENT_TYPES, False)
+        self.pending = []
+        self.tick = 0  # Stamped on emitted events; set by the controller
+
+    def subscribe(self, callback, event_types=EVENT_TYPES):
+        """
+        Register a callback that is called once per tick with the tick and its SimulationEvents.
+
+        :param callback: Callable taking (tick, list of events).
+        :param event_types: Event types to deliver (all by default).
+        """
+        self.subscribers.append((callback, set(event_types)))
+        self.update_listening()
+
+    def unsubscribe(self, callback):
+        self.subscribers = [(existing, types) for existing, types in self.subscribers if existing != callback]
+        self.update_listening()
+
+    def update_listening(self):
+        for event_type in EVENT_TYPES:
+            self.listening[event_type] = any(event_type in types for _, types in self.subscribers)
+
+    def emit(self, event_type, pmn_id, dn_id, mass):
+        """
+        Queue one event for the next flush, if anybody listens for its type.
+        """
+        if self.listening[event_type]:
+            self.pending.append(SimulationEvent(event_type, self.tick, pmn_id, dn_id, mass))
+
+    def emit_many(self, event_type, pmn_ids, dn_ids, masses):
+        """
+        Queue one event per element of the given sequences.
+        """
+        if self.listening[event_type]:
+            self.pending.extend(
+                SimulationEvent(event_type, self.tick, int(pmn_id), int(dn_id), float(mass))
+                for pmn_id, dn_id, mass in zip(pmn_ids, dn_ids, masses)
+            )
+
+    def flush(self):
+        """
+        Deliver the events queued since the last flush, one batch per subscriber.
+        """
+        events, self.pending = self.pending, []
+        for callback, types in self.subscribers:
+            callback(self.tick, [event for event in events if event.type in types])
+
+
+class LogSink:
+    def __init__(self, interval=10, output=print, status=None):
+        """
+        Event subscriber that aggregates events and logs at most one summary per interval ticks:
+        counts per event type, plus completions and absorbed mass per PMN.
+
+        :param interval: Minimum number of ticks between two summaries.
+        :param output: Callable receiving each log line.
+        :param status: Optional callable returning extra lines (e.g. queue state) for each summary.
+        """
+        self.interval = max(1, int(interval))
+        self.output = output
+        self.status = status
+        self.first_tick = 0  # First tick of the current window
+        self.reset()
+
+    def reset(self):
+        self.counts = dict.fromkeys(EVENT_TYPES, 0)
+        self.completed_per_pmn = {}  # PMN node ID -> [completions, mass gained]
+
+    def __call__(self, tick, events):
+        for event in events:
+            self.counts[event.type] += 1
+            if event.type == COMPLETED:
+                totals = self.completed_per_pmn.setdefault(event.pmn_id, [0, 0.0])
+                totals[0] += 1
+                totals[1] += event.mass
+
+        if tick - self.first_tick + 1 >= self.interval:
+            if any(self.counts.values()):
+                self.write(self.first_tick, tick)
+            self.first_tick = tick + 1
+            self.reset()
+
+    def write(self, first_tick, last_tick):
+        counts = ", ".join(f"{event_type} {count}" for event_type, count in self.counts.items())
+        self.output(f"[Events] ticks {first_tick}-{last_tick}: {counts}")
+        for pmn_id, (completions, mass) in sorted(self.completed_per_pmn.items()):
+            self.output(f"[Events]   PMN {pmn_id}: completed {completions} DNs, mass +{mass:.2f}")
+        if self.status is not None:
+            for line in self.status():
+                self.output(line)
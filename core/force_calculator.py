@@ -1,73 +1,245 @@
 import numpy as np
-from core.node import DynamicNode, PrimaryMassNode
-import json
+from core.node_store import DN_KIND, PMN_KIND
+from core.charge_matrix import ChargeMatrix
+from core.spatial_hash import SpatialHash
+from core.barnes_hut import BarnesHutTree
+from core.random_streams import RandomStreams, PERTURBATION_STREAM, COLLISION_STREAM
+import time
+
+FORCE_CHUNK_PAIRS = 1 << 20  # DN/PMN pairs evaluated per block in compute_total_forces
+COLLISION_RESTITUTION = 0.9
+COLLISION_DAMPING = 0.98
+
+
+def pair_distances(positions, first, second):
+    """
+    Distance between the positions of each (first, second) slot pair.
+    """
+    r_vector = positions[second] - positions[first]
+    return np.sqrt((r_vector * r_vector).sum(axis=1))
+
+
+def independent_contacts(first, second, size):
+    """
+    Mask of the contacts that are the earliest (lowest index) contact of both their nodes.
+    The selected contacts are node-disjoint, and at least one contact is always selected.
+    """
+    index = np.arange(len(first))
+    earliest = np.full(size, len(first))
+    np.minimum.at(earliest, first, index)
+    np.minimum.at(earliest, second, index)
+    return (earliest[first] == index) & (earliest[second] == index)
+
+
+def scatter_add(index, values, size):
+    """
+    Sum the (K, 2) rows of values into a (size, 2) array at the given row indices.
+    """
+    return np.stack([
+        np.bincount(index, weights=values[:, 0], minlength=size),
+        np.bincount(index, weights=values[:, 1], minlength=size)
+    ], axis=1)
+
 
 class ForceCalculator:
-    def __init__(self, config):
-        #self.config = config
-        
-        with open(config, "r") as file:
-            self.config = json.load(file)
-        
-    def apply_forces(self, nodes):
+    def __init__(self, config, random_streams=None):
+        """
+        :param config: Shared SimulationConfig instance.
+        :param random_streams: The simulation's RandomStreams; seeded from config if None.
+        """
+        self.config = config
+        self.random = random_streams if random_streams is not None else RandomStreams(config.seed)
+        self.steps = 0  # apply_forces calls so far; the counter of the per-step random draws
+        self.charge_matrix = ChargeMatrix(self.config)
+        self.candidate_pair_counts = {"dn": 0, "pmn": 0}  # Broad-phase pairs in the last pass
+
+    def apply_forces(self, store, dt=1.0):
         """
         Calculate gravitational forces between DNs and PMNs and update velocities.
+        Operates on the NodeStore columns in one batched pass; with force_mode
+        "barnes_hut" and enough PMNs, distant PMN groups are approximated by a quadtree.
+
+        :param store: NodeStore holding the simulation nodes.
+        :param dt: Step length in ticks; 1.0 reproduces the per-tick update.
+        """
+        dn_slots = store.slots_of_kind(DN_KIND)
+        self.steps += 1
+        if not len(dn_slots):
+            return
+        draws = self.perturbation_draws(store, dn_slots)
+        store.velocities[dn_slots] = self.compute_dn_velocities(
+            store.velocities[dn_slots], store.masses[dn_slots], self.compute_dn_forces(store, dn_slots), dt, draws
+        )
+
+    def perturbation_draws(self, store, dn_slots):
+        """
+        The three uniforms per DN of the current step, keyed on the DN keys.
+
+        :return: (len(dn_slots), 3) array.
+        """
+        return self.random.uniform(PERTURBATION_STREAM, self.steps, store.keys[dn_slots], 3)
+
+    def normal_draws(self, store, first, second):
         """
-        speed_multiplier = 1
-        G = 1.2 * speed_multiplier  # Gravitational constant (scaling factor)
-        softening = 5
-        max_force = 15
-        max_velocity = 20
+        Random collision normals (unnormalized, components in [-0.5, 0.5)) of the current
+        step for coincident pairs, keyed on the keys of both nodes.
 
-        for node in nodes:
-            if isinstance(node, DynamicNode):
-                total_force = np.zeros(2)
+        :param first: Slots of the first node of each pair.
+        :param second: Slots of the second node of each pair.
+        :return: (len(first), 2) array.
+        """
+        pair_keys = (store.keys[first] << 32) ^ store.keys[second]
+        return self.random.uniform(COLLISION_STREAM, self.steps, pair_keys, 2) - 0.5
 
-                for other in nodes:
-                    if isinstance(other, PrimaryMassNode):
-                        # Calculate per-PMN gravitational charge
-                        gravitational_charge = self.calculate_gravitational_charge(node, other)
+    def compute_dn_forces(self, store, dn_slots):
+        """
+        Total unclamped gravitational force of all PMNs on the given DNs.
 
-                        # Compute distance and force
-                        r_vector = other.position - node.position
-                        distance = np.linalg.norm(r_vector) + softening
-                        force = (G * gravitational_charge) * r_vector / (distance ** 1.9)
+        :param store: NodeStore holding the simulation nodes.
+        :param dn_slots: Slots of the DNs.
+        :return: (len(dn_slots), 2) array of forces.
+        """
+        pmn_slots = store.slots_of_kind(PMN_KIND)
+
+        features, weights = self.charge_matrix.rows(store, dn_slots, pmn_slots)
+        positions = store.positions[dn_slots]
+        pmn_positions = store.positions[pmn_slots]
+        if self.use_barnes_hut(len(pmn_slots)):
+            tree = BarnesHutTree(pmn_positions, weights, self.config.barnes_hut_leaf_size)
+            total_force = tree.compute_forces(
+                positions, features, self.config.gravitational_constant, self.config.softening,
+                self.config.barnes_hut_theta
+            )
+        else:
+            total_force = self.compute_total_forces(positions, pmn_positions, features, weights)
+        return total_force
+
+    def use_barnes_hut(self, pmn_count):
+        """
+        Whether the Barnes-Hut approximation is enabled and worth building a tree for.
+        """
+        return self.config.force_mode == "barnes_hut" and pmn_count >= self.config.barnes_hut_min_pmns
+
+    def compute_total_forces(self, positions, pmn_positions, features, weights):
+        """
+        Sum the softened gravitational pull of every PMN on every DN.
+
+        :param positions: (N, 2) array of DN positions.
+        :param pmn_positions: (P, 2) array of PMN positions.
+        :param features: (N, A) DN feature rows from the charge matrix.
+        :param weights: (P, A) PMN weight rows from the charge matrix.
+        :return: (N, 2) array of total forces, before clamping.
+        """
+        total_force = np.zeros((len(positions), 2))
+        if len(pmn_positions) == 0:
+            return total_force
+
+        # Bound the size of the (rows, P) temporaries, charges included, for very large scenes
+        rows_per_chunk = max(1, FORCE_CHUNK_PAIRS // len(pmn_positions))
+        for start in range(0, len(positions), rows_per_chunk):
+            stop = start + rows_per_chunk
+            charges = features[start:stop] @ weights.T
+            dx = pmn_positions[None, :, 0] - positions[start:stop, 0, None]
+            dy = pmn_positions[None, :, 1] - positions[start:stop, 1, None]
+            distance = np.sqrt(dx * dx + dy * dy) + self.config.softening
+            scale = (self.config.gravitational_constant * charges) / (distance ** 1.9)
+            total_force[start:stop, 0] = (scale * dx).sum(axis=1)
+            total_force[start:stop, 1] = (scale * dy).sum(axis=1)
+
+        return total_force
+
+    def compute_dn_velocities(self, velocities, masses, total_force, dt=1.0, draws=None):
+        """
+        Batched DN velocity update: force clamp, perturbations, velocity clamp and damping.
+
+        :param velocities: (N, 2) array of DN velocities.
+        :param masses: (N,) array of DN masses.
+        :param total_force: (N, 2) array of summed forces on each DN.
+        :param dt: Step length in ticks.
+        :param draws: (N, 3) uniforms for the perturbations, see apply_perturbations.
+        :return: (N, 2) array of updated velocities.
+        """
+        # Clamp the force magnitude
+        force_magnitude = np.sqrt((total_force * total_force).sum(axis=1))
+        max_force = self.config.max_force
+        too_strong = force_magnitude > max_force
+        total_force[too_strong] = (
+            total_force[too_strong] / force_magnitude[too_strong, None]
+        ) * max_force
 
-                        total_force += force
+        acceleration = (total_force / masses[:, None]) * 100 * self.config.speed_multiplier
+        velocities = velocities + acceleration * dt
 
-                # Apply force to the DN
-                force_magnitude = np.linalg.norm(total_force)
-                if force_magnitude > max_force:
-                    total_force = (total_force / force_magnitude) * max_force
+        # Apply tangential motion and random perturbations
+        return self.apply_perturbations(velocities, self.config.max_velocity, dt, draws)
 
-                node.velocity += (total_force / node.mass) * 100 * speed_multiplier
+    def barnes_hut_error_report(self, store, thetas=(0.3, 0.5, 0.7, 1.0)):
+        """
+        Compare Barnes-Hut forces with the exact kernel on the current state, per opening angle.
+        Use it to tune barnes_hut_theta: lower is more accurate, higher is faster.
 
-                # Apply tangential motion and random perturbations
-                self.apply_perturbations(node, max_velocity)
+        :param store: NodeStore holding the simulation nodes.
+        :param thetas: Opening angles to evaluate.
+        :return: List of dicts with theta, relative force errors and timings in seconds.
+        """
+        dn_slots = store.slots_of_kind(DN_KIND)
+        pmn_slots = store.slots_of_kind(PMN_KIND)
+        features, weights = self.charge_matrix.rows(store, dn_slots, pmn_slots)
+        positions = store.positions[dn_slots]
+        pmn_positions = store.positions[pmn_slots]
+
+        started = time.perf_counter()
+        exact = self.compute_total_forces(positions, pmn_positions, features, weights)
+        exact_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        tree = BarnesHutTree(pmn_positions, weights, self.config.barnes_hut_leaf_size)
+        build_seconds = time.perf_counter() - started
+
+        exact_magnitude = np.maximum(np.sqrt((exact * exact).sum(axis=1)), 1e-12)
+        report = []
+        for theta in thetas:
+            started = time.perf_counter()
+            approximate = tree.compute_forces(
+                positions, features, self.config.gravitational_constant, self.config.softening, theta
+            )
+            seconds = time.perf_counter() - started
+            error = np.sqrt(((approximate - exact) ** 2).sum(axis=1)) / exact_magnitude
+            report.append({
+                "theta": theta,
+                "dns": len(dn_slots),
+                "pmns": len(pmn_slots),
+                "mean_relative_error": float(error.mean()) if len(error) else 0.0,
+                "p99_relative_error": float(np.percentile(error, 99)) if len(error) else 0.0,
+                "max_relative_error": float(error.max()) if len(error) else 0.0,
+                "exact_seconds": exact_seconds,
+                "build_seconds": build_seconds,
+                "barnes_hut_seconds": seconds,
+            })
+        return report
 
     def calculate_gravitational_charge(self, dn, pmn):
         """
         Calculate the gravitational charge for a DynamicNode (DN) relative to a PrimaryMassNode (PMN).
         The gravitational charge is based on the DN's attributes and the PMN's preferences.
+        Single-pair reference; apply_forces reads all pairs from self.charge_matrix.
         """
         charge = 0.0
         preferences = pmn.attributes.get("preferences", {})  # Safely get preferences from PMN attributes
-        config_attributes = self.config.get("attributes", {})
-        invert_attributes = self.config.get("invert_attributes", [])
 
         for attribute, weight in preferences.items():
             # Retrieve DN attribute value and default to 0 if not found
             dn_value = dn.attributes.get(attribute, 0)
-            attr_config = config_attributes.get(attribute, {})
+            index = self.config.attribute_index.get(attribute)
 
             # Normalize attribute value if min and max are available in the config
-            min_value = attr_config.get("min", 0)
-            max_value = attr_config.get("max", 1)  # Avoid divide-by-zero with a sensible default
+            min_value = self.config.mins[index] if index is not None else 0
+            max_value = self.config.maxs[index] if index is not None else 1  # Avoid divide-by-zero with a sensible default
             if max_value != min_value:
                 dn_value = (dn_value - min_value) / (max_value - min_value)
 
             # Apply inversion if the attribute is listed in invert_attributes
-            if attribute in invert_attributes:
+            if attribute in self.config.invert_attributes:
                 dn_value = 1.0 - dn_value
 
             # Accumulate the charge
@@ -75,63 +247,174 @@ class ForceCalculator:
 
         return charge
 
-
-    def apply_perturbations(self, node, max_velocity):
+    def apply_perturbations(self, velocities, max_velocity, dt=1.0, draws=None):
         """
         Apply tangential motion, random micro-perturbations, and clamp velocity.
+        Uses three uniforms per DN; apply_forces draws them counter-based from the
+        DN keys, so they do not depend on node order or sharding.
+        Over a step of dt ticks the drift and damping scale with dt and the random
+        kick with sqrt(dt), so sub-stepping keeps the per-tick statistics.
+
+        :param velocities: (N, 2) array of DN velocities.
+        :param max_velocity: Speed limit applied after the perturbations.
+        :param dt: Step length in ticks.
+        :param draws: (N, 3) uniforms in [0, 1); drawn from the perturbation stream's generator if None.
+        :return: (N, 2) array of perturbed, clamped and damped velocities.
         """
+        if draws is None:
+            draws = self.random.generator(PERTURBATION_STREAM).random((len(velocities), 3))
+
         # Tangential motion
-        tangent_vector = np.array([-node.velocity[1], node.velocity[0]])
-        tangent_norm = np.linalg.norm(tangent_vector)
-        if tangent_norm != 0:
-            tangent_vector /= tangent_norm
-            node.velocity += tangent_vector * np.random.uniform(0.005, 0.01)
+        tangent_vector = np.stack([-velocities[:, 1], velocities[:, 0]], axis=1)
+        tangent_norm = np.sqrt((tangent_vector * tangent_vector).sum(axis=1))
+        moving = tangent_norm != 0
+        tangent_vector[moving] /= tangent_norm[moving, None]
+        tangent_step = 0.005 + (0.01 - 0.005) * draws[:, 0]
+        velocities[moving] += tangent_vector[moving] * (tangent_step[moving, None] * dt)
 
         # Random micro-perturbation
-        random_nudge = (np.random.rand(2) - 0.5) * 0.2
-        node.velocity += random_nudge
+        velocities += (draws[:, 1:] - 0.5) * (0.2 * np.sqrt(dt))
 
         # Clamp velocity
-        speed = np.linalg.norm(node.velocity)
-        if speed > max_velocity:
-            node.velocity = (node.velocity / speed) * max_velocity
+        speed = np.sqrt((velocities * velocities).sum(axis=1))
+        too_fast = speed > max_velocity
+        velocities[too_fast] = (velocities[too_fast] / speed[too_fast, None]) * max_velocity
 
         # Damping
-        node.velocity *= 0.998
+        velocities *= self.config.damping ** dt
+        return velocities
 
-    def resolve_dn_collisions(self, nodes):
+    def resolve_dn_collisions(self, store):
         """
         Resolve collisions between DNs.
         """
-        for i, node_a in enumerate(nodes):
-            if isinstance(node_a, DynamicNode):
-                for j, node_b in enumerate(nodes):
-                    if i >= j or not isinstance(node_b, DynamicNode):
-                        continue
+        self.candidate_pair_counts["dn"] = self.resolve_collisions(store, DN_KIND, 1.5)
 
-                    r_vector = node_b.position - node_a.position
-                    distance = np.linalg.norm(r_vector)
-                    min_distance = 1.5 * ((node_a.mass ** (1/3)) + (node_b.mass ** (1/3)))
+    def resolve_pmn_collisions(self, store):
+        """
+        Resolve collisions between PMNs.
+        """
+        self.candidate_pair_counts["pmn"] = self.resolve_collisions(store, PMN_KIND, 1.0)
 
-                    if distance < min_distance:
-                        self.elastic_collision(node_a, node_b)
+    def find_collision_candidates(self, store, slots, radius_scale):
+        """
+        Spatial-hash broad phase over the given slots. Two nodes can only collide when
+        closer than radius_scale * (m_a^(1/3) + m_b^(1/3)), so the grid cell is sized
+        from the largest such distance.
 
-    def resolve_pmn_collisions(self, nodes):
+        :return: (first, second) slot arrays of candidate pairs, in slot order.
         """
-        Resolve collisions between PMNs.
+        if len(slots) < 2:
+            return slots[:0], slots[:0]
+        radii = store.masses[slots] ** (1 / 3)
+        cell_size = radius_scale * 2 * radii.max()
+        first, second = SpatialHash(cell_size).candidate_pairs(store.positions[slots])
+        return slots[first], slots[second]
+
+    def resolve_collisions(self, store, kind, radius_scale):
+        """
+        Resolve collisions between nodes of one kind: spatial-hash broad phase, then
+        batched narrow phase and elastic resolution of the touching candidates.
+        With collision_mode "jacobi" (default) every touching contact is resolved at once
+        against the same state, collision_iterations times, so a pass costs a fixed
+        number of array operations however dense the cluster. "sequential" reproduces
+        the pairwise i < j loop exactly, see resolve_sequentially.
+
+        :return: Number of candidate pairs produced by the broad phase.
         """
-        for i, node_a in enumerate(nodes):
-            if isinstance(node_a, PrimaryMassNode):
-                for j, node_b in enumerate(nodes):
-                    if i >= j or not isinstance(node_b, PrimaryMassNode):
-                        continue
+        first, second = self.find_collision_candidates(store, store.slots_of_kind(kind), radius_scale)
+        candidate_count = len(first)
 
-                    r_vector = node_b.position - node_a.position
-                    distance = np.linalg.norm(r_vector)
-                    min_distance = (node_a.mass ** (1/3)) + (node_b.mass ** (1/3))
+        radii = store.masses ** (1/3)
+        min_distance = radius_scale * (radii[first] + radii[second])
 
-                    if distance < min_distance:
-                        self.elastic_collision(node_a, node_b)
+        if self.config.collision_mode == "sequential":
+            self.resolve_sequentially(store, first, second, min_distance)
+            return candidate_count
+
+        for _ in range(self.config.collision_iterations):
+            touching = pair_distances(store.positions, first, second) < min_distance
+            if not touching.any():
+                break
+            self.elastic_collisions(store, first[touching], second[touching])
+
+        return candidate_count
+
+    def resolve_sequentially(self, store, first, second, min_distance):
+        """
+        Reference resolution in rounds. Each round holds the candidates that are the
+        earliest pending pair of both of their nodes, so no node appears twice in a round
+        and every node sees its pairs in the same order, and with the same state, as the
+        pairwise i < j loop did. Dense clusters need as many rounds as their longest
+        chain of dependent contacts.
+        """
+        while len(first):
+            batch = independent_contacts(first, second, store.count)
+            batch_first, batch_second = first[batch], second[batch]
+
+            touching = pair_distances(store.positions, batch_first, batch_second) < min_distance[batch]
+            self.elastic_collisions(store, batch_first[touching], batch_second[touching])
+
+            first, second, min_distance = first[~batch], second[~batch], min_distance[~batch]
+
+    def elastic_collisions(self, store, first, second):
+        """
+        Resolve a batch of elastic collisions in whole-array form (one Jacobi pass).
+        Every contact is evaluated against the state at the start of the batch; a node in
+        several contacts receives the mean of its corrections and of its impulses
+        (scatter-add in pair order, so the result is deterministic) and is damped once.
+        Averaging keeps dense clusters from gaining energy. For node-disjoint contacts
+        this equals calling elastic_collision on each pair.
+
+        :param store: NodeStore holding the nodes.
+        :param first: Slots of the first node of each contact.
+        :param second: Slots of the second node of each contact.
+        """
+        if not len(first):
+            return
+        count = store.count
+        positions = store.positions
+        velocities = store.velocities
+        mass_a = store.masses[first]
+        mass_b = store.masses[second]
+
+        normal_vector = positions[second] - positions[first]
+        distance = np.sqrt((normal_vector * normal_vector).sum(axis=1))
+        coincident = distance == 0
+        if coincident.any():
+            normal_vector[coincident] = self.normal_draws(store, first[coincident], second[coincident])
+            distance[coincident] = np.sqrt((normal_vector[coincident] ** 2).sum(axis=1))
+        normal_vector /= distance[:, None]
+
+        # Push overlapping nodes apart, weighted by the other node's mass
+        overlap = 0.5 * ((mass_a ** (1/3)) + (mass_b ** (1/3))) - distance
+        correction = normal_vector * np.maximum(overlap, 0)[:, None]
+        total_mass = (mass_a + mass_b)[:, None]
+        position_delta = (
+            scatter_add(first, -correction * (mass_b[:, None] / total_mass), count)
+            + scatter_add(second, correction * (mass_a[:, None] / total_mass), count)
+        )
+        contacts = np.bincount(first, minlength=count) + np.bincount(second, minlength=count)
+
+        # Exchange restitution impulses between approaching nodes only
+        relative_velocity = velocities[first] - velocities[second]
+        velocity_along_normal = (relative_velocity * normal_vector).sum(axis=1)
+        approaching = velocity_along_normal <= 0
+        impulse_magnitude = -(1 + COLLISION_RESTITUTION) * velocity_along_normal
+        impulse_magnitude /= (1 / mass_a) + (1 / mass_b)
+        impulse = np.where(approaching, impulse_magnitude, 0)[:, None] * normal_vector
+        velocity_delta = (
+            scatter_add(first, impulse / mass_a[:, None], count)
+            - scatter_add(second, impulse / mass_b[:, None], count)
+        )
+        impacts = (
+            np.bincount(first[approaching], minlength=count)
+            + np.bincount(second[approaching], minlength=count)
+        )
+
+        positions[:count] += position_delta / np.maximum(contacts, 1)[:, None]
+        damping = np.where(impacts > 0, COLLISION_DAMPING, 1.0)
+        velocities[:count] = (velocities[:count] + velocity_delta / np.maximum(impacts, 1)[:, None]) * damping[:, None]
 
     def elastic_collision(self, node_a, node_b):
         """
@@ -141,7 +424,8 @@ class ForceCalculator:
         distance = np.linalg.norm(normal_vector)
 
         if distance == 0:
-            normal_vector = np.random.rand(2) - 0.5
+            pair_key = (node_a.key << 32) ^ node_b.key
+            normal_vector = self.random.uniform(COLLISION_STREAM, self.steps, [pair_key], 2)[0] - 0.5
             distance = np.linalg.norm(normal_vector)
 
         normal_vector /= distance
@@ -157,7 +441,7 @@ class ForceCalculator:
         if velocity_along_normal > 0:
             return
 
-        restitution = 0.9
+        restitution = COLLISION_RESTITUTION
         impulse_magnitude = -(1 + restitution) * velocity_along_normal
         impulse_magnitude /= (1 / node_a.mass) + (1 / node_b.mass)
 
@@ -165,5 +449,5 @@ class ForceCalculator:
         node_a.velocity += impulse / node_a.mass
         node_b.velocity -= impulse / node_b.mass
 
-        node_a.velocity *= 0.98
-        node_b.velocity *= 0.98
+        node_a.velocity *= COLLISION_DAMPING
+        node_b.velocity *= COLLISION_DAMPING
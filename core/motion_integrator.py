@@ -1,32 +1,122 @@
-from core.node import DynamicNode, PrimaryMassNode
+from core.config import DEFAULT_TRAIL_LENGTH, DEFAULT_INTEGRATOR, DEFAULT_WORLD_WIDTH, DEFAULT_WORLD_HEIGHT
+from core.node_store import DN_KIND, PMN_KIND
+from core.trail_buffer import TrailBuffer
+from core.event_bus import EXPIRED, NO_PMN
+from core.profiler import PhaseProfiler
 import numpy as np
 
+INTEGRATORS = ("euler", "leapfrog")
+
+# Wall-collision size per node kind (index = kind); 20 for unknown kinds
+NODE_SIZES = np.array([20.0, 20.0, 20.0])
+NODE_SIZES[DN_KIND] = 10
+NODE_SIZES[PMN_KIND] = 30
+
+
 class MotionIntegrator:
-    def __init__(self, window_width=800, window_height=600):
+    def __init__(self, window_width=None, window_height=None, config=None):
         """
         Initialize the motion integrator with optional window dimensions.
 
-        :param window_width: Width of the simulation area.
-        :param window_height: Height of the simulation area.
+        :param window_width: Width of the simulation area (config world_width by default).
+        :param window_height: Height of the simulation area (config world_height by default).
+        :param config: Shared SimulationConfig (trail length, integrator, world size).
         """
+        if window_width is None:
+            window_width = config.world_width if config is not None else DEFAULT_WORLD_WIDTH
+        if window_height is None:
+            window_height = config.world_height if config is not None else DEFAULT_WORLD_HEIGHT
         self.window_width = window_width
         self.window_height = window_height
+        self.trail_length = config.trail_length if config is not None else DEFAULT_TRAIL_LENGTH
+        self.events = None  # Optional EventBus notified of expired DNs
+        self.profiler = PhaseProfiler()  # Disabled unless the controller shares an enabled one
+        self.integrator = config.integrator if config is not None else DEFAULT_INTEGRATOR
+        if self.integrator not in INTEGRATORS:
+            print(f"[Warning] Unknown integrator '{self.integrator}'. Using '{DEFAULT_INTEGRATOR}'.")
+            self.integrator = DEFAULT_INTEGRATOR
+
+    def set_bounds(self, width, height):
+        """
+        Resize the simulation area the nodes are reflected in.
+        """
+        self.window_width = width
+        self.window_height = height
+
+    def step(self, store, force_calculator, dt=1.0):
+        """
+        Advance every node by one integration step of dt ticks.
+
+        "euler" applies the forces first and then moves with the new velocity (the
+        original per-tick update). "leapfrog" drifts half a step, applies the forces
+        at the midpoint and drifts the other half, which is second-order accurate
+        for the same single force evaluation.
+
+        :param store: NodeStore holding the simulation nodes.
+        :param force_calculator: ForceCalculator that updates the DN velocities.
+        :param dt: Step length in ticks.
+        """
+        profiler = self.profiler
+        if self.integrator == "leapfrog":
+            first_drift = profiler.start()
+            slots = store.live_slots()
+            self.drift(store, slots, dt / 2)
+            kick = profiler.start()
+            force_calculator.apply_forces(store, dt)
+            second_drift = profiler.start()
+            self.drift(store, slots, dt / 2)
+            self.handle_boundaries(store, slots)
+            self.handle_lifetimes(store, store.slots_of_kind(DN_KIND), dt)
+            end = profiler.start()
+            if first_drift and kick and second_drift and end:  # Skip a step the profiler was toggled during
+                profiler.record("forces", second_drift - kick)
+                profiler.record("positions", (kick - first_drift) + (end - second_drift))
+        else:
+            start = profiler.start()
+            force_calculator.apply_forces(store, dt)
+            start = profiler.lap("forces", start)
+            self.update_positions(store, dt)
+            profiler.lap("positions", start)
 
-    def update_positions(self, nodes):
+    def update_positions(self, store, dt=1.0):
         """
         Update the positions of all nodes based on their velocities and manage boundaries.
+
+        :param store: NodeStore holding the simulation nodes.
+        :param dt: Step length in ticks.
+        """
+        slots = store.live_slots()
+        self.drift(store, slots, dt)
+        self.handle_boundaries(store, slots)
+        self.handle_lifetimes(store, store.slots_of_kind(DN_KIND), dt)
+
+    def drift(self, store, slots, dt=1.0):
+        """
+        Move the given slots along their velocities in one batched update.
         """
-        for node in nodes:
-            # Update position based on velocity
-            node.position += node.velocity
+        if dt == 1.0:
+            store.positions[slots] += store.velocities[slots]
+        else:
+            store.positions[slots] += store.velocities[slots] * dt
 
-            # Update trail for Dynamic Nodes
-            if isinstance(node, DynamicNode):
-                self.update_trail(node)
-                self.handle_lifetime(node, nodes)
+    def trail_buffer(self, store):
+        """
+        The store's trail ring buffer, allocated with the configured length on first use.
+        """
+        if store.trails is None or store.trails.length != self.trail_length:
+            TrailBuffer(store, self.trail_length)
+        return store.trails
 
-            # Handle wall boundaries
-            self.handle_boundaries(node)
+    def update_trails(self, store, slots=None):
+        """
+        Append the current position of each given slot to its trail in one batched write.
+
+        :param store: The NodeStore holding the nodes.
+        :param slots: Slots whose trails to update (all DNs by default).
+        """
+        if slots is None:
+            slots = store.slots_of_kind(DN_KIND)
+        self.trail_buffer(store).push(slots)
 
     def update_trail(self, node):
         """
@@ -34,48 +124,47 @@ class MotionIntegrator:
 
         :param node: The DynamicNode to update.
         """
-        node.trail.append(node.position.copy())
-        max_trail_length = 15  # Configurable trail length
-        if len(node.trail) > max_trail_length:
-            node.trail.pop(0)
+        self.update_trails(node.store, np.array([node.slot]))
 
-    def handle_lifetime(self, node, nodes):
+    def handle_lifetimes(self, store, slots, dt=1.0):
         """
-        Remove nodes if their lifetime expires (optional for burst effects).
+        Count down lifetimes and remove expired nodes (optional for burst effects).
+        Nodes without a lifetime carry an infinite one. Each removal is O(1).
 
-        :param node: The node to check for lifetime expiration.
-        :param nodes: The list of all nodes in the simulation.
+        :param store: The NodeStore holding the simulation nodes.
+        :param slots: Slots whose lifetimes to count down.
+        :param dt: Elapsed time in ticks.
         """
-        if hasattr(node, 'lifetime'):
-            node.lifetime -= 1
-            if node.lifetime <= 0:
-                nodes.remove(node)
+        store.lifetimes[slots] -= dt
+        expired = slots[store.lifetimes[slots] <= 0]
+        if self.events is not None and len(expired):
+            self.events.emit_many(EXPIRED, [NO_PMN] * len(expired), store.ids[expired], store.masses[expired])
+        for slot in expired:
+            store.remove(store.handles[slot])
 
-    def handle_boundaries(self, node):
+    def handle_boundaries(self, store, slots):
         """
         Reflect nodes off the walls of the simulation area.
 
-        :param node: The node to check for boundary collisions.
+        :param store: The NodeStore holding the simulation nodes.
+        :param slots: Slots to check for boundary collisions.
         """
-        size = self.get_node_size(node)
+        half_sizes = NODE_SIZES[store.kinds[slots]] / 2
+        positions = store.positions[slots]
 
         # Left and Right Walls
-        if node.position[0] - size / 2 <= 0 or node.position[0] + size / 2 >= self.window_width:
-            node.velocity[0] *= -1  # Reverse X velocity
+        hit_x = (positions[:, 0] - half_sizes <= 0) | (positions[:, 0] + half_sizes >= self.window_width)
+        store.velocities[slots[hit_x], 0] *= -1  # Reverse X velocity
 
         # Top and Bottom Walls
-        if node.position[1] - size / 2 <= 0 or node.position[1] + size / 2 >= self.window_height:
-            node.velocity[1] *= -1  # Reverse Y velocity
+        hit_y = (positions[:, 1] - half_sizes <= 0) | (positions[:, 1] + half_sizes >= self.window_height)
+        store.velocities[slots[hit_y], 1] *= -1  # Reverse Y velocity
 
     def get_node_size(self, node):
         """
-        Determine the size of a node based on its attributes or type.
+        Determine the size of a node based on its type.
 
         :param node: The node to determine size for.
         :return: The size of the node.
         """
-        if isinstance(node, DynamicNode):
-            return 10  # Example size for DynamicNode
-        elif isinstance(node, PrimaryMassNode):
-            return 30  # Example size for PrimaryMassNode
-        return 20  # Default size for unknown nodes
+        return NODE_SIZES[node.kind] if 0 <= node.kind < len(NODE_SIZES) else NODE_SIZES[0]
@@ -1,102 +1,157 @@
 import numpy as np
 import random
+from core.config import SimulationConfig
+from core.node_store import NodeStore, DN_KIND, PMN_KIND
+from core.processing_queue import ProcessingQueue
+
+DEFAULT_CONFIG = SimulationConfig()  # Shared by DNs created without a config
+DEFAULT_RNG = np.random.default_rng()  # Used by nodes created without a simulation's generator
+
 
 class Node:
-    def __init__(self, x=0, y=0, mass=1, velocity=None):
-        self.position = np.array([x, y], dtype=float)
-        self.velocity = np.array(velocity, dtype=float) if velocity is not None else np.zeros(2)
-        self.mass = mass
+    __slots__ = ("store", "slot")
+    kind = 0
+
+    def __init__(self, x=0, y=0, mass=1, velocity=None, store=None):
+        """
+        Lightweight handle onto one slot of a NodeStore.
+
+        :param store: NodeStore to allocate the node in. A private store is created if None.
+        """
+        velocity = np.array(velocity, dtype=float) if velocity is not None else np.zeros(2)
+        if store is None:
+            store = NodeStore(capacity=1)
+        store.add(self, (x, y), velocity, mass)
+
+    @property
+    def node_id(self):
+        """
+        Stable integer ID, unchanged when the node moves to another slot or store.
+        """
+        return int(self.store.ids[self.slot])
+
+    @property
+    def key(self):
+        """
+        Per-simulation node key, see NodeStore.keys.
+        """
+        return int(self.store.keys[self.slot])
+
+    @property
+    def position(self):
+        return self.store.positions[self.slot]
+
+    @position.setter
+    def position(self, value):
+        self.store.positions[self.slot] = value
+
+    @property
+    def velocity(self):
+        return self.store.velocities[self.slot]
+
+    @velocity.setter
+    def velocity(self, value):
+        self.store.velocities[self.slot] = value
+
+    @property
+    def mass(self):
+        return self.store.masses[self.slot]
+
+    @mass.setter
+    def mass(self, value):
+        self.store.masses[self.slot] = value
+
+    @property
+    def lifetime(self):
+        return self.store.lifetimes[self.slot]
+
+    @lifetime.setter
+    def lifetime(self, value):
+        self.store.lifetimes[self.slot] = value
 
 
 class DynamicNode(Node):
-    def __init__(self, mass=None, config=None, attributes=None, position=None, velocity=None):
+    __slots__ = ("config", "attributes")
+    kind = DN_KIND
+
+    def __init__(self, mass=None, config=None, attributes=None, position=None, velocity=None, store=None, rng=None):
         """
         DynamicNode represents a task or item with configurable attributes.
 
-        :param config: Configuration for normalization and weights.
+        :param config: Shared SimulationConfig for normalization and weights.
         :param attributes: Dictionary containing DN attributes (e.g., threads, memory, render_time).
         :param position: Initial position as a 2D array. Random if None.
         :param velocity: Initial velocity as a 2D array. Random if None.
+        :param store: NodeStore to allocate the node in.
+        :param rng: numpy Generator for the random defaults, DEFAULT_RNG if None.
         """
-        self.config = config or {}
+        rng = rng if rng is not None else DEFAULT_RNG
+        self.config = config if config is not None else DEFAULT_CONFIG
         self.attributes = attributes or {}
 
         # Default random attributes if not provided
         if not self.attributes:
             self.attributes = {
-                "render_time": np.random.uniform(1, 10),
-                "memory": np.random.uniform(1024, 8192),
-                "threads": np.random.randint(1, 16)
+                "render_time": rng.uniform(1, 10),
+                "memory": rng.uniform(1024, 8192),
+                "threads": int(rng.integers(1, 16))
             }
 
         if not mass:
             # Calculate mass using the config
-            self.mass = self.calculate_mass()
-        else:
-            self.mass = mass
+            mass = self.calculate_mass()
 
         # Randomize position and velocity if not provided
         if position is None:
-            position = np.random.uniform([100, 100], [700, 500])
+            position = rng.uniform([100, 100], [700, 500])
 
         if velocity is None:
-            velocity = np.random.uniform(-0.5, 0.5, size=2)
+            velocity = rng.uniform(-0.5, 0.5, size=2)
 
         # Call the parent class initializer
-        super().__init__(position[0], position[1], self.mass, velocity)
+        super().__init__(position[0], position[1], mass, velocity, store)
 
-        # Initialize the trail attribute
-        self.trail = []  # List to store the history of positions
+    @property
+    def trail(self):
+        """
+        History of recent positions, oldest first, as a view into the store's trail buffer.
+        """
+        if self.store.trails is None:
+            return np.zeros((0, 2))
+        return self.store.trails.view(self.slot)
 
     def calculate_mass(self):
         """
         Calculate the mass of the DN based on attributes and config weights.
         Includes a base mass and amplified scaling to avoid extremely small values.
         """
-        total_weight = sum(v["weight"] for v in self.config.get("attributes", {}).values())
-        base_mass = 1  # Ensure every DN has at least this mass
-        mass = 0.0
-
-        for attr, settings in self.config.get("attributes", {}).items():
-            value = self.attributes.get(attr, 0)  # Attribute value
-
-            # Normalize only if min and max are set
-            if "min" in settings and "max" in settings:
-                normalized = (value - settings["min"]) / (settings["max"] - settings["min"])
-                normalized = max(0, min(1, normalized))  # Clamp between 0 and 1
-            else:
-                normalized = value  # Use raw value if no normalization range
-
-            mass += normalized * settings["weight"]
-
-        # Amplify mass scaling and add base mass
-        scaled_mass = base_mass + (mass / max(1.0, total_weight) * 10.0)
-
-        # Clamp mass to avoid extremes
-        return max(5, min(scaled_mass, 100))  # Clamp between 5 and 100
-
-
-
-
+        values = self.config.attribute_matrix([self.attributes])
+        return float(self.config.compute_masses(values)[0])
 
 
 class PrimaryMassNode(Node):
+    __slots__ = (
+        "id", "attributes", "threads", "memory", "preferences",
+        "queue", "idle_timer", "processing_capacity"
+    )
+    kind = PMN_KIND
     id_counter = 0  # Static counter for unique IDs
 
-    def __init__(self, x=None, y=None, mass=None, position=None, velocity=None, **attributes):
+    def __init__(self, x=None, y=None, mass=None, position=None, velocity=None, store=None, rng=None, **attributes):
+        rng = rng if rng is not None else DEFAULT_RNG
         if position is not None:
             x, y = position
         elif x is None or y is None:
-            x, y = np.random.uniform(100, 700), np.random.uniform(100, 500)
+            x, y = rng.uniform(100, 700), rng.uniform(100, 500)
 
         # Heavier but balanced PMNs
         if mass is None:
-            mass = np.random.uniform(20.0, 40.0)
+            mass = rng.uniform(20.0, 40.0)
 
         if velocity is None:
             velocity = np.zeros(2)
 
-        super().__init__(x, y, mass, velocity)
+        super().__init__(x, y, mass, velocity, store)
 
         self.id = PrimaryMassNode.id_counter  # Assign a unique ID
         PrimaryMassNode.id_counter += 1
@@ -105,7 +160,7 @@ class PrimaryMassNode(Node):
         self.threads = self.attributes.get("threads", 1)  # Extract threads
         self.memory = self.attributes.get("memory", 1024)  # Extract memory
         self.preferences = self.attributes.get("preferences", {})  # Extract preferences
-        self.current_dns = []  # Tracks currently processing DNs
+        self.queue = ProcessingQueue()  # Tracks currently processing DNs
         self.idle_timer = 0  # Tracks idle time
         self.processing_capacity = 0  # Tracks processing load
 
@@ -113,12 +168,10 @@ class PrimaryMassNode(Node):
         """
         Determine if the PMN can process more DNs based on available threads.
         """
-        current_threads_used = sum(dn.attributes.get("threads", 1) for dn, _ in self.current_dns)
-        return current_threads_used < self.threads  # Only allow if threads are available
+        return self.queue.threads_used < self.threads  # Only allow if threads are available
 
     def update_processing_capacity(self):
         """
         Update the processing capacity based on the current load (active DNs).
         """
-        total_mass = sum(dn.mass for dn, _ in self.current_dns)
-        self.processing_capacity = min(total_mass / self.mass, 1.0)  # Ensure capacity is clamped to 1.0
+        self.processing_capacity = min(self.queue.total_mass / self.mass, 1.0)  # Ensure capacity is clamped to 1.0
@@ -0,0 +1,243 @@
+import itertools
+import numpy as np
+
+DN_KIND = 1
+PMN_KIND = 2
+
+MIN_COMPACT_TOMBSTONES = 64  # Compact once tombstones exceed this and a quarter of the slots
+
+
+class NodeStore:
+    next_id = 0  # Global counter, so node IDs stay unique when nodes move between stores
+
+    def __init__(self, capacity=64, shard_of=None):
+        """
+        Struct-of-arrays storage for node state. Each node occupies one slot (row)
+        in every column; DynamicNode and PrimaryMassNode are handles onto a slot.
+        Removal only tombstones a slot (O(1)); compact() later closes the gaps in
+        one vectorized pass, keeping the insertion order of the live nodes.
+
+        :param capacity: Initial number of slots to allocate.
+        :param shard_of: Store of the same simulation to share node keys with (see keys).
+        """
+        self.capacity = max(1, capacity)
+        self.count = 0  # Slots in use, tombstones included
+        self.tombstones = 0
+        self.handles = []  # Node handle per slot, None for tombstones
+        self.slot_of_id = {}  # Stable node ID -> current slot
+        self.columns = {}
+        self.column_fills = {}
+        self.trails = None  # TrailBuffer attached by the MotionIntegrator
+        self.key_counter = shard_of.key_counter if shard_of is not None else itertools.count()  # See keys
+
+        self.register_column("positions", (2,), float, 0.0)
+        self.register_column("velocities", (2,), float, 0.0)
+        self.register_column("masses", (), float, 0.0)
+        self.register_column("kinds", (), np.int8, 0)  # 0 for tombstones
+        self.register_column("lifetimes", (), float, np.inf)  # inf: never expires
+        self.register_column("ids", (), np.int64, -1)
+        self.register_column("keys", (), np.int64, -1)  # Keys the counter-based random draws
+        self.register_column("alive", (), bool, False)
+
+    @property
+    def positions(self):
+        return self.columns["positions"]
+
+    @property
+    def velocities(self):
+        return self.columns["velocities"]
+
+    @property
+    def masses(self):
+        return self.columns["masses"]
+
+    @property
+    def kinds(self):
+        return self.columns["kinds"]
+
+    @property
+    def lifetimes(self):
+        return self.columns["lifetimes"]
+
+    @property
+    def ids(self):
+        return self.columns["ids"]
+
+    @property
+    def keys(self):
+        """
+        Per-simulation node key, numbered in creation order. Unlike the process-wide node IDs
+        it depends only on what was added to the simulation, so two simulations built the
+        same way key their random draws the same in one process. Shards of one simulation
+        share the counter, and a node keeps its key when it moves between them.
+        """
+        return self.columns["keys"]
+
+    @property
+    def alive(self):
+        return self.columns["alive"]
+
+    def __len__(self):
+        return self.count - self.tombstones
+
+    def register_column(self, name, tail_shape=(), dtype=float, fill=0.0):
+        """
+        Add (or reset) a per-slot column that grows and moves together with the core columns.
+
+        :param name: Column name, used as key in self.columns.
+        :param tail_shape: Per-slot shape, e.g. (2,) for a vector.
+        :param dtype: NumPy dtype of the column.
+        :param fill: Value given to new and reset slots.
+        :return: The column array, shaped (capacity, *tail_shape).
+        """
+        self.columns[name] = np.full((self.capacity, *tail_shape), fill, dtype=dtype)
+        self.column_fills[name] = fill
+        return self.columns[name]
+
+    def reserve(self, capacity):
+        """
+        Grow every column to hold at least the given number of slots.
+        """
+        if capacity <= self.capacity:
+            return
+        new_capacity = max(capacity, 2 * self.capacity)
+        for name, column in self.columns.items():
+            grown = np.full((new_capacity, *column.shape[1:]), self.column_fills[name], dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+        self.capacity = new_capacity
+
+    def add(self, node, position, velocity, mass):
+        """
+        Allocate a slot and a new stable ID for a node handle and initialize its core columns.
+
+        :return: The slot index.
+        """
+        slot = self.append_slot(node)
+        self.positions[slot] = position
+        self.velocities[slot] = velocity
+        self.masses[slot] = mass
+        self.kinds[slot] = node.kind
+        self.ids[slot] = NodeStore.next_id
+        self.keys[slot] = next(self.key_counter)
+        self.alive[slot] = True
+        self.slot_of_id[NodeStore.next_id] = slot
+        NodeStore.next_id += 1
+        return slot
+
+    def append_slot(self, node):
+        """
+        Bind a handle to the next free slot, with every column at its fill value.
+        """
+        self.reserve(self.count + 1)
+        slot = self.count
+        for name, column in self.columns.items():
+            column[slot] = self.column_fills[name]
+        self.handles.append(node)
+        node.store = self
+        node.slot = slot
+        self.count += 1
+        return slot
+
+    def release_slot(self, slot):
+        """
+        Tombstone a slot in O(1). Other slots do not move until compact().
+        """
+        self.slot_of_id.pop(int(self.ids[slot]), None)
+        self.handles[slot] = None
+        self.kinds[slot] = 0
+        self.alive[slot] = False
+        self.tombstones += 1
+
+    def adopt(self, node):
+        """
+        Move a node from its current store into this one, carrying over every shared column
+        (including its stable ID). Its key is carried over from a shard of the same
+        simulation; a node from anywhere else gets the next key of this simulation.
+
+        :param node: Node handle bound to another store.
+        """
+        source, source_slot = node.store, node.slot
+        if source is self:
+            return
+        slot = self.append_slot(node)
+        for name, column in self.columns.items():
+            source_column = source.columns.get(name)
+            if source_column is not None and source_column.shape[1:] == column.shape[1:]:
+                column[slot] = source_column[source_slot]
+        self.slot_of_id[int(self.ids[slot])] = slot
+        if source.key_counter is not self.key_counter:
+            self.keys[slot] = next(self.key_counter)
+        source.release_slot(source_slot)
+
+    def remove(self, node):
+        """
+        Remove a node from the store in O(1). The handle keeps its last state in a private store.
+        """
+        NodeStore(capacity=1).adopt(node)
+
+    def compact(self):
+        """
+        Close the gaps left by removed nodes, keeping live nodes in insertion order.
+        Slots change, so call it between passes, never while holding slot arrays.
+        """
+        if not self.tombstones:
+            return
+        live = np.flatnonzero(self.alive[:self.count])
+        for name, column in self.columns.items():
+            column[:len(live)] = column[live]
+            column[len(live):self.count] = self.column_fills[name]
+
+        self.handles = [self.handles[slot] for slot in live]
+        for slot, node in enumerate(self.handles):
+            node.slot = slot
+        self.slot_of_id = dict(zip(self.ids[:len(live)].tolist(), range(len(live))))
+        self.count = len(live)
+        self.tombstones = 0
+
+    def compact_if_needed(self):
+        """
+        Compact once tombstones make up a sizeable share of the slots (amortized O(1) per removal).
+
+        :return: True if the store was compacted.
+        """
+        if self.tombstones > max(MIN_COMPACT_TOMBSTONES, self.count // 4):
+            self.compact()
+            return True
+        return False
+
+    def __contains__(self, node):
+        return node.store is self
+
+    def slot_of(self, node_id):
+        """
+        Current slot of a node ID, or None if the node is not in this store.
+        """
+        return self.slot_of_id.get(node_id)
+
+    def node(self, node_id):
+        """
+        Node handle for a stable node ID, or None if the node is not in this store.
+        """
+        slot = self.slot_of_id.get(node_id)
+        return None if slot is None else self.handles[slot]
+
+    def live_slots(self):
+        """
+        Slots holding live nodes, in insertion order.
+        """
+        return np.flatnonzero(self.alive[:self.count])
+
+    def slots_of_kind(self, kind):
+        """
+        Slots holding live nodes of the given kind, in insertion order.
+        """
+        return np.flatnonzero(self.kinds[:self.count] == kind)
+
+    def nodes(self, kind=None):
+        """
+        Live node handles in insertion order, optionally restricted to one kind.
+        """
+        if kind is None:
+            return [node for node in self.handles if node is not None]
+        return [self.handles[slot] for slot in self.slots_of_kind(kind)]
@@ -0,0 +1,57 @@
+UNCLAIMED = -1
+
+
+class OwnershipTable:
+    def __init__(self, store):
+        """
+        Global DN -> owning PMN table, kept in NodeStore columns so it follows the
+        nodes through compaction. Claim and release are O(1); the "unclaimed" column
+        doubles as a query mask, so admission lookups skip DNs another PMN already owns.
+
+        :param store: NodeStore holding the simulation nodes.
+        """
+        self.store = store
+        store.register_column("owners", (), int, UNCLAIMED)  # Node ID of the owning PMN
+        store.register_column("unclaimed", (), bool, True)
+
+    @property
+    def unclaimed(self):
+        return self.store.columns["unclaimed"]
+
+    def owner_id(self, dn):
+        """
+        Node ID of the PMN that owns a DN, or UNCLAIMED.
+        """
+        return int(self.store.columns["owners"][dn.slot]) if dn in self.store else UNCLAIMED
+
+    def is_claimed(self, dn):
+        return self.owner_id(dn) != UNCLAIMED
+
+    def claim(self, dn, pmn):
+        """
+        Give a DN to a PMN unless another PMN already owns it.
+
+        :return: True if the PMN owns the DN afterwards.
+        """
+        owners = self.store.columns["owners"]
+        owner = owners[dn.slot]
+        if owner != UNCLAIMED:
+            return owner == pmn.node_id
+        owners[dn.slot] = pmn.node_id
+        self.unclaimed[dn.slot] = False
+        return True
+
+    def claim_slots(self, dn_slots, pmn_ids):
+        """
+        Batched claim of unclaimed DNs, one owner node ID per DN slot.
+        """
+        self.store.columns["owners"][dn_slots] = pmn_ids
+        self.unclaimed[dn_slots] = False
+
+    def release(self, dn):
+        """
+        Make a DN available to every PMN again.
+        """
+        if dn in self.store:
+            self.store.columns["owners"][dn.slot] = UNCLAIMED
+            self.unclaimed[dn.slot] = True
@@ -0,0 +1,99 @@
+import heapq
+
+
+class ProcessingQueue:
+    def __init__(self):
+        """
+        Work queue of a PMN as a min-heap of jobs keyed by absolute completion tick.
+        Thread and mass totals are maintained incrementally, so a tick only touches
+        the jobs that complete in it. Jobs of a DN that is dropped stay in the heap
+        and are skipped when they surface (lazy deletion).
+        """
+        self.heap = []  # (completion_tick, sequence, generation, dn)
+        self.jobs = {}  # DN node ID -> [generation, job count, mass, threads] of its live jobs
+        self.sequence = 0  # Keeps jobs due on the same tick in admission order
+        self.job_count = 0
+        self.threads_used = 0
+        self.total_mass = 0.0
+
+    def __len__(self):
+        return self.job_count
+
+    def __contains__(self, dn):
+        return dn.node_id in self.jobs
+
+    def push(self, dn, completion_tick):
+        """
+        Queue a job for a DN. The DN's mass and thread demand are counted as of now.
+
+        :param dn: DynamicNode to process.
+        :param completion_tick: Tick on which the job completes.
+        """
+        mass = dn.mass
+        threads = dn.attributes.get("threads", 1)
+        job = self.jobs.get(dn.node_id)
+        if job is None:
+            job = self.jobs[dn.node_id] = [self.sequence, 0, 0.0, 0]
+        job[1] += 1
+        job[2] += mass
+        job[3] += threads
+        heapq.heappush(self.heap, (completion_tick, self.sequence, job[0], dn))
+        self.sequence += 1
+        self.job_count += 1
+        self.threads_used += threads
+        self.total_mass += mass
+
+    def pop_due(self, tick):
+        """
+        Remove every job due by the given tick. A DN with several jobs is reported once
+        per due job, and its jobs that are not yet due are dropped along with it.
+
+        :param tick: Current tick.
+        :return: List of DNs, one per completed job, in completion then admission order.
+        """
+        completed = []
+        while self.heap and self.heap[0][0] <= tick:
+            entry = heapq.heappop(self.heap)
+            if self.is_live(entry):
+                completed.append(entry[3])
+
+        for dn in completed:
+            self.discard(dn)
+        return completed
+
+    def is_live(self, entry):
+        """
+        Whether a heap entry belongs to a job that has not been dropped.
+        """
+        job = self.jobs.get(entry[3].node_id)
+        return job is not None and job[0] == entry[2]
+
+    def discard(self, dn):
+        """
+        Drop every remaining job of a DN in O(1); its heap entries are skipped later.
+        """
+        job = self.jobs.pop(dn.node_id, None)
+        if job is None:
+            return
+        self.job_count -= job[1]
+        self.threads_used -= job[3]
+        self.total_mass -= job[2]
+        if not self.job_count:
+            self.threads_used = 0
+            self.total_mass = 0.0  # Drop accumulated rounding error
+        if len(self.heap) > 2 * self.job_count + 64:
+            self.prune()
+
+    def prune(self):
+        """
+        Rebuild the heap without the entries of dropped jobs.
+        """
+        self.heap = [entry for entry in self.heap if self.is_live(entry)]
+        heapq.heapify(self.heap)
+
+    def dns(self):
+        """
+        DNs with at least one job in the queue.
+        """
+        entries = sorted(entry for entry in self.heap if self.is_live(entry))
+        return list({entry[3].node_id: entry[3] for entry in entries}.values())
@@ -0,0 +1,164 @@
+from core.config import DEFAULT_PROFILE_WINDOW, DEFAULT_PROFILE_DUMP_INTERVAL
+from collections import deque
+import numpy as np
+import threading
+import json
+import time
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_RATE_WINDOW = 1.0  # Seconds RateMeter averages over
+
+
+class RollingHistogram:
+    def __init__(self, window=DEFAULT_PROFILE_WINDOW):
+        """
+        The last window duration samples of one phase, in nanoseconds, in a ring buffer.
+        """
+        self.samples = np.zeros(max(1, int(window)), dtype=np.int64)
+        self.head = 0
+        self.filled = 0
+        self.total_count = 0
+
+    def add(self, duration_ns):
+        self.samples[self.head] = duration_ns
+        self.head = (self.head + 1) % len(self.samples)
+        self.filled = min(self.filled + 1, len(self.samples))
+        self.total_count += 1
+
+    def summary(self):
+        """
+        Percentiles, mean and max of the window in milliseconds, plus sample counts.
+        """
+        window = self.samples[:self.filled] / 1e6
+        stats = {"count": self.total_count, "window": self.filled}
+        if self.filled:
+            for percentile, value in zip(PERCENTILES, np.percentile(window, PERCENTILES)):
+                stats[f"p{percentile}_ms"] = float(value)
+            stats["mean_ms"] = float(window.mean())
+            stats["max_ms"] = float(window.max())
+        return stats
+
+
+class RateMeter:
+    def __init__(self, window=DEFAULT_RATE_WINDOW):
+        """
+        Events per second over the last window seconds, e.g. simulation ticks or painted
+        frames. tick() and rate() may be called from different threads.
+
+        :param window: Averaging window in seconds.
+        """
+        self.window = window
+        self.times = deque()
+        self.lock = threading.Lock()
+
+    def tick(self, count=1):
+        """
+        Record count events happening now.
+        """
+        now = time.perf_counter()
+        with self.lock:
+            self.times.extend([now] * count)
+            self.expire(now)
+
+    def rate(self):
+        """
+        Events per second in the window ending now; falls to 0 once events stop.
+        """
+        with self.lock:
+            self.expire(time.perf_counter())
+            return len(self.times) / self.window
+
+    def expire(self, now):
+        while self.times and self.times[0] < now - self.window:
+            self.times.popleft()
+
+
+class PhaseProfiler:
+    def __init__(self, enabled=False, window=DEFAULT_PROFILE_WINDOW, dump_path=None, dump_interval=DEFAULT_PROFILE_DUMP_INTERVAL):
+        """
+        Per-phase timings with perf_counter_ns. Phases are timed as
+
+            start = profiler.start()
+            ...
+            start = profiler.lap("phase", start)
+
+        While disabled, start() returns 0 and lap() returns at once, so the hooks
+        cost two attribute checks per phase. A lap from a start taken while disabled
+        is not recorded, so enabling mid-tick cannot produce a bogus sample. The
+        simulation thread records while the GUI thread reads the summary, so the
+        phase table is guarded by a lock.
+
+        :param enabled: Record timings.
+        :param window: Samples kept per phase for the percentiles.
+        :param dump_path: JSON file that maybe_dump() writes to, None for no dumps.
+        :param dump_interval: Minimum seconds between two dumps.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.last_dump_time = time.perf_counter()
+        self.phases = {}  # Phase name -> RollingHistogram
+        self.lock = threading.Lock()
+
+    def start(self):
+        """
+        Timestamp in nanoseconds to measure a phase from; 0 while disabled.
+        """
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def lap(self, phase, start_ns):
+        """
+        Record the time since start_ns under a phase name.
+
+        :return: Timestamp to measure the next phase from.
+        """
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        if start_ns:
+            self.record(phase, now - start_ns)
+        return now
+
+    def record(self, phase, duration_ns):
+        """
+        Record a measured duration under a phase name.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = RollingHistogram(self.window)
+            histogram.add(duration_ns)
+
+    def summary(self):
+        """
+        Rolling p50/p95/p99, mean and max per phase, in milliseconds.
+        """
+        with self.lock:
+            return {phase: histogram.summary() for phase, histogram in self.phases.items()}
+
+    def reset(self):
+        with self.lock:
+            self.phases = {}
+
+    def dump(self, path=None):
+        """
+        Write the summary as JSON.
+
+        :param path: Output file, dump_path by default.
+        """
+        with open(path or self.dump_path, "w") as file:
+            json.dump({"time": time.time(), "phases": self.summary()}, file, indent=2)
+
+    def maybe_dump(self):
+        """
+        Dump to dump_path if enabled and dump_interval seconds passed since the last dump.
+        """
+        if not self.enabled or self.dump_path is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_dump_time >= self.dump_interval:
+            self.last_dump_time = now
+            self.dump()
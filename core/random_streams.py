@@ -0,0 +1,73 @@
+import numpy as np
+
+# Stream numbers; each engine draws from its own stream so adding draws to one never shifts another
+PERTURBATION_STREAM = 0
+COLLISION_STREAM = 1
+INITIALIZATION_STREAM = 2
+INTERACTIVE_STREAM = 3
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+UNIT_SCALE = 2.0 ** -53
+
+
+def mix64(values):
+    """
+    SplitMix64 finalizer over a uint64 array: a bijection that spreads every input bit
+    over the whole output word. Products wrap modulo 2**64. Works in place on values.
+    """
+    values ^= values >> np.uint64(30)
+    values *= MIX_MULTIPLIERS[0]
+    values ^= values >> np.uint64(27)
+    values *= MIX_MULTIPLIERS[1]
+    values ^= values >> np.uint64(31)
+    return values
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        """
+        Per-simulation random numbers, all derived from one seed.
+
+        Per-step draws (perturbations, collision normals) are counter-based: uniform()
+        hashes (seed, stream, counter, node key, draw index), so a value depends only
+        on which node it is for, never on how many values were drawn before it or by which
+        worker. Sharding the nodes (stores created with shard_of) or reordering them
+        leaves every draw unchanged.
+        One-off draws (node initialization, UI) use sequential numpy Generators, one per stream.
+
+        :param seed: Integer seed, None for fresh OS entropy (kept in self.seed so a run can be replayed).
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy
+        self.key = seed_sequence.generate_state(1, np.uint64)
+        self.generators = {}  # Stream -> numpy Generator
+
+    def generator(self, stream):
+        """
+        Sequential numpy Generator for a stream, created on first use.
+        """
+        generator = self.generators.get(stream)
+        if generator is None:
+            seed_sequence = np.random.SeedSequence(self.seed, spawn_key=(stream,))
+            generator = self.generators[stream] = np.random.Generator(np.random.Philox(seed_sequence))
+        return generator
+
+    def uniform(self, stream, counter, ids, draws=1):
+        """
+        Counter-based uniforms in [0, 1), draws values per ID, in one vectorized pass.
+
+        :param stream: Stream number.
+        :param counter: Step counter, e.g. the integration step.
+        :param ids: (N,) integer keys (NodeStore keys, or pair keys) to draw for.
+        :param draws: Values per ID.
+        :return: (N, draws) float array.
+        """
+        stream_key = mix64(self.key + np.array([stream], dtype=np.uint64) * GOLDEN_GAMMA)
+        step_key = mix64(stream_key ^ np.array([counter], dtype=np.uint64))
+        # SplitMix64 output for counter ids * draws + j of a sequence started at step_key
+        words = np.asarray(ids).astype(np.uint64)[:, None] * np.uint64(draws) + np.arange(1, draws + 1, dtype=np.uint64)
+        words *= GOLDEN_GAMMA
+        words += step_key
+        mix64(words)
+        return (words >> np.uint64(11)) * UNIT_SCALE
@@ -0,0 +1,209 @@
+import numpy as np
+import threading
+import math
+import copy
+import time
+
+NO_TARGET = -1
+
+
+def frozen(array):
+    """
+    Read-only copy of an array, so a published snapshot cannot change under the painter.
+    """
+    array = np.array(array)
+    array.flags.writeable = False
+    return array
+
+
+def density_counts(positions, width, height, bin_size):
+    """
+    2D histogram of positions over a width x height area, in square bins.
+
+    :param positions: (N, 2) positions in pixels; positions outside the area are dropped.
+    :return: (rows, columns) array of counts.
+    """
+    columns = max(1, math.ceil(width / bin_size))
+    rows = max(1, math.ceil(height / bin_size))
+    x = positions[:, 0] * (1 / bin_size)
+    y = positions[:, 1] * (1 / bin_size)
+    inside = (x >= 0) & (x < columns) & (y >= 0) & (y < rows)
+    cells = y[inside].astype(np.intp) * columns + x[inside].astype(np.intp)  # Truncation is floor for x, y >= 0
+    counts = np.bincount(cells, minlength=rows * columns)
+    return counts.reshape(rows, columns)
+
+
+def blend_positions(previous_ids, previous_positions, ids, positions, alpha):
+    """
+    Positions between two snapshots: previous + alpha * (current - previous) for the IDs
+    present in both, the current position for IDs new since the previous snapshot.
+
+    :param previous_ids: (M,) node IDs of the previous snapshot, any order.
+    :param ids: (N,) node IDs of the current snapshot.
+    :param alpha: 0 for the previous positions, 1 for the current ones.
+    :return: (N, 2) float array.
+    """
+    result = np.array(positions, dtype=float)
+    if len(previous_ids) == 0 or len(ids) == 0:
+        return result
+    order = np.argsort(previous_ids)
+    sorted_ids = previous_ids[order]
+    index = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    matched = sorted_ids[index] == ids
+    start = previous_positions[order[index[matched]]]
+    result[matched] = start + alpha * (result[matched] - start)
+    return result
+
+
+class RenderSnapshot:
+    def __init__(
+        self, tick, dn_positions, dn_masses, display, filament_targets, filament_distances, pmn_positions, pmn_capacities,
+        trail_points=None, trail_counts=None, density=None, bin_size=1, dn_ids=None, pmn_ids=None
+    ):
+        """
+        What SimulationView draws for one tick, as read-only arrays. DN arrays are in
+        store order; display and the filament arrays refer to them by index.
+
+        :param tick: Tick the snapshot was taken after.
+        :param dn_positions: (D, 2) positions of every DN.
+        :param dn_masses: (D,) masses of every DN.
+        :param display: (K,) indices of the displayed DNs (the heaviest ones, in store order).
+        :param filament_targets: (K,) index into the PMN arrays of each displayed DN's nearest PMN, NO_TARGET if none.
+        :param filament_distances: (K,) distance to that PMN.
+        :param pmn_positions: (P, 2) PMN positions.
+        :param pmn_capacities: (P,) PMN processing capacities.
+        :param trail_points: (K, L, 2) trail of each displayed DN, oldest first; only the last trail_counts[i] points of row i are valid.
+        :param trail_counts: (K,) valid trail points per displayed DN.
+        :param density: (rows, columns) DN counts per bin_size square, set when the DNs are too
+            many to draw one by one (level of detail); the display set is then empty.
+        :param bin_size: Side of a density bin in pixels.
+        :param dn_ids: (D,) node IDs of the DNs, to match them across snapshots when interpolating.
+        :param pmn_ids: (P,) node IDs of the PMNs.
+        """
+        self.tick = tick
+        self.density = frozen(density) if density is not None else None
+        self.bin_size = bin_size
+        self.dn_positions = frozen(dn_positions)
+        self.dn_masses = frozen(dn_masses)
+        self.display = frozen(display)
+        self.filament_targets = frozen(filament_targets)
+        self.filament_distances = frozen(filament_distances)
+        self.pmn_positions = frozen(pmn_positions)
+        self.pmn_capacities = frozen(pmn_capacities)
+        self.trail_points = frozen(trail_points if trail_points is not None else np.zeros((len(display), 0, 2)))
+        self.trail_counts = frozen(trail_counts if trail_counts is not None else np.zeros(len(display), dtype=int))
+        self.dn_ids = frozen(dn_ids) if dn_ids is not None else None
+        self.pmn_ids = frozen(pmn_ids) if pmn_ids is not None else None
+
+    @property
+    def dn_count(self):
+        return len(self.dn_masses)
+
+    @property
+    def lod(self):
+        return self.density is not None
+
+    def interpolated(self, previous, alpha):
+        """
+        This snapshot with DN and PMN positions moved back towards a previous one.
+        Density maps and snapshots without node IDs are returned unchanged.
+
+        :param previous: Earlier RenderSnapshot, or None.
+        :param alpha: 0 for the previous positions, 1 for this snapshot's.
+        :return: A RenderSnapshot sharing every other array with this one.
+        """
+        if previous is None or previous is self or alpha >= 1 or self.lod or self.dn_ids is None or previous.dn_ids is None:
+            return self
+        blended = copy.copy(self)
+        blended.dn_positions = frozen(
+            blend_positions(previous.dn_ids, previous.dn_positions, self.dn_ids, self.dn_positions, alpha)
+        )
+        blended.pmn_positions = frozen(
+            blend_positions(previous.pmn_ids, previous.pmn_positions, self.pmn_ids, self.pmn_positions, alpha)
+        )
+        return blended
+
+
+class SnapshotBuffer:
+    def __init__(self):
+        """
+        Double buffer of the two most recently published RenderSnapshots and their publish
+        times. The simulation thread publishes while the GUI thread paints; the pair is
+        swapped under a lock, and the snapshots themselves are read-only.
+        """
+        self.lock = threading.Lock()
+        self.previous = None  # (snapshot, publish time)
+        self.current = None
+
+    def publish(self, snapshot):
+        with self.lock:
+            self.previous, self.current = self.current, (snapshot, time.perf_counter())
+
+    def pair(self):
+        """
+        :return: ((previous snapshot, time), (latest snapshot, time)); either may be None.
+        """
+        with self.lock:
+            return self.previous, self.current
+
+    @property
+    def latest(self):
+        current = self.current
+        return current[0] if current is not None else None
+
+    def interpolated(self, now=None):
+        """
+        Snapshot to paint at time now, one publish interval behind the simulation: blended
+        from the previous towards the latest snapshot by the time since the latest publish.
+
+        :return: RenderSnapshot, None before the first publish.
+        """
+        previous, current = self.pair()
+        if current is None:
+            return None
+        snapshot, published = current
+        if previous is None:
+            return snapshot
+        interval = published - previous[1]
+        if interval <= 0:
+            return snapshot
+        now = time.perf_counter() if now is None else now
+        alpha = min(max((now - published) / interval, 0.0), 1.0)
+        return snapshot.interpolated(previous[0], alpha)
+
+
+class DisplayRanking:
+    def __init__(self):
+        """
+        Mass-ranked selection of the DNs to display, cached until the DN set, their
+        masses or the display limit change. Selection is an argpartition (O(N)), not a sort;
+        the selected DNs keep their store order.
+        """
+        self.ids = None
+        self.masses = None
+        self.limit = None
+        self.display = None
+
+    def rank(self, ids, masses, limit):
+        """
+        :param ids: (D,) node IDs of the DNs, in store order.
+        :param masses: (D,) their masses.
+        :param limit: Percentage of the DNs to display.
+        :return: (K,) indices of the displayed DNs, ascending.
+        """
+        if (
+            limit == self.limit and self.display is not None
+            and np.array_equal(ids, self.ids) and np.array_equal(masses, self.masses)
+        ):
+            return self.display
+
+        count = int(len(masses) * limit / 100)
+        if count >= len(masses):
+            selected = np.arange(len(masses))
+        elif count > 0:
+            selected = np.sort(np.argpartition(-masses, count - 1)[:count])
+        else:
+            selected = np.zeros(0, dtype=int)
+
+        self.ids, self.masses, self.limit, self.display = ids.copy(), masses.copy(), limit, selected
+        return selected
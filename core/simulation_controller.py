@@ -1,54 +1,172 @@
-from ui.main_window import MainWindow
 from core.force_calculator import ForceCalculator
 from core.motion_integrator import MotionIntegrator
 from core.node import DynamicNode, PrimaryMassNode
-from PyQt5.QtWidgets import QApplication
+from core.node_store import NodeStore, DN_KIND, PMN_KIND
+from core.spatial_index import SpatialIndex
+from core.ownership_table import OwnershipTable
+from core.config import SimulationConfig
+from core.event_bus import EventBus, LogSink, ADMITTED, STARTED, COMPLETED, ABSORBED
+from core.profiler import PhaseProfiler
+from core.random_streams import RandomStreams, INITIALIZATION_STREAM
+from core.render_snapshot import RenderSnapshot, SnapshotBuffer, DisplayRanking, NO_TARGET, density_counts
 import numpy as np
+import threading
 import sys
 import json
+import time
 
-DEFAULT_PROXIMITY_THRESHOLD = 20  # Distance in pixels for merging
 DEFAULT_MERGE_TIME_THRESHOLD = 50  # Frames required to trigger merging
+CLAIM_BATCH_SIZE = 8  # Unclaimed DNs fetched per k-nearest query when filling a PMN
 
 
 class SimulationController:
-    def __init__(self, config_file="data/config.json", dn_file="data/dn_dataset.json", pmn_file="data/pmn_dataset.json"):
-        self.force_calculator = ForceCalculator(config=config_file)
-        self.motion_integrator = MotionIntegrator()
-        self.nodes = []
+    def __init__(
+        self, config_file="data/config.json", dn_file="data/dn_dataset.json", pmn_file="data/pmn_dataset.json",
+        config=None, dns=None, pmns=None
+    ):
+        """
+        :param config_file: Config JSON, used unless config is given.
+        :param dn_file: DN dataset JSON, used unless dns is given.
+        :param pmn_file: PMN dataset JSON, used unless pmns is given.
+        :param config: In-memory config, a SimulationConfig or its dict.
+        :param dns: In-memory DN dataset, a list of DN dicts.
+        :param pmns: In-memory PMN dataset, a list of PMN dicts.
+        """
+        if config is None:
+            config = self.load_config(config_file)
+        elif not isinstance(config, SimulationConfig):
+            config = SimulationConfig(config)
+        self.config = config  # Parsed once, shared by reference
+        self.random = RandomStreams(self.config.seed)  # Every random draw of this simulation
+        self.force_calculator = ForceCalculator(config=self.config, random_streams=self.random)
+        self.motion_integrator = MotionIntegrator(config=self.config)
+        self.store = NodeStore()  # Columnar state behind every node handle
+        self.spatial_indexes = {}  # Node kind -> SpatialIndex, rebuilt lazily after nodes move
+        self.ownership = OwnershipTable(self.store)  # DN -> PMN claims
         self.enable_dn_collisions = False  # Default: Collisions are OFF
-        self.config = self.load_config(config_file)  # Load the config
-        self.setup_simulation(dn_file, pmn_file)
+        self.events = EventBus()  # Processing events, delivered in one batch per tick
+        self.motion_integrator.events = self.events
+        self.profiler = PhaseProfiler(
+            enabled=self.config.profiling_enabled, window=self.config.profile_window,
+            dump_path=self.config.profile_dump_path, dump_interval=self.config.profile_dump_interval
+        )  # Per-phase timings of advance() and the paint, shared with the integrator, worker and view
+        self.motion_integrator.profiler = self.profiler
+        self.log_sink = None
+        self.verbose = True  # Aggregated processing log on stdout
+        self.window = None  # MainWindow, created by run() in GUI mode
+        self.dn_display_limit = 100  # Percentage of DNs drawn, heaviest first
+        self.display_ranking = DisplayRanking()
+        self.publish_snapshots = False  # Build a RenderSnapshot after every tick (set by the GUI)
+        self.snapshots = SnapshotBuffer()  # The two latest RenderSnapshots, read by the view
+        self.lock = threading.RLock()  # Held while stepping; other threads take it to change the simulation
+        self.completed_counts = {}  # PMN node ID -> DNs it finished processing
+        self.setup_simulation(dn_file, pmn_file, dns, pmns)
         self.tick_counter = 0  # Add a tick counter for throttling
+        self.substep_counter = 0  # Integration steps taken in the current tick
+        self.accumulator = 0.0  # Wall time not yet simulated, in integration steps
+
+    @property
+    def verbose(self):
+        return self.log_sink is not None
+
+    @verbose.setter
+    def verbose(self, enabled):
+        """
+        Attach or detach the rate-limited LogSink that summarizes processing events on stdout.
+        """
+        if enabled and self.log_sink is None:
+            self.log_sink = LogSink(status=self.status_lines)
+            self.events.subscribe(self.log_sink)
+        elif not enabled and self.log_sink is not None:
+            self.events.unsubscribe(self.log_sink)
+            self.log_sink = None
+
+    @property
+    def snapshot(self):
+        """
+        Latest published RenderSnapshot, None before the first.
+        """
+        return self.snapshots.latest
+
+    @property
+    def nodes(self):
+        """
+        Snapshot list of every node handle, in insertion order.
+        """
+        return self.store.nodes()
+
+    def add_node(self, node):
+        """
+        Move a node (e.g. one created by the UI) into the simulation store.
+        """
+        with self.lock:
+            self.store.adopt(node)
+            self.spatial_indexes.clear()
+            if self.publish_snapshots:
+                self.publish_snapshot()
+
+    def remove_node(self, node):
+        """
+        Remove a node from the simulation in O(1); the handle keeps its last state.
+        """
+        with self.lock:
+            if node in self.store:
+                self.store.remove(node)
+
+    def set_dn_attributes(self, dn, attributes):
+        """
+        Replace the attributes of a DN and rebuild its cached charge row on the next tick.
+        """
+        with self.lock:
+            dn.attributes = attributes
+            self.force_calculator.charge_matrix.invalidate_dn(dn)
+
+    def set_pmn_preferences(self, pmn, preferences):
+        """
+        Replace the preferences of a PMN and rebuild its cached charge row on the next tick.
+        """
+        with self.lock:
+            pmn.preferences = pmn.attributes["preferences"] = preferences
+            self.force_calculator.charge_matrix.invalidate_pmn(pmn)
 
     def load_config(self, config_file):
-        try:
-            with open(config_file, "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            print(f"[Warning] Config file not found: {config_file}. Using defaults.")
-            return {}
+        return SimulationConfig.load(config_file)
 
-    def setup_simulation(self, dn_file, pmn_file):
-        self.load_pmns(pmn_file)
-        self.load_dns(dn_file)
+    def setup_simulation(self, dn_file, pmn_file, dns=None, pmns=None):
+        if pmns is None:
+            self.load_pmns(pmn_file)
+        else:
+            self.add_pmns(pmns)
+        if dns is None:
+            self.load_dns(dn_file)
+        else:
+            self.add_dns(dns)
 
     def load_pmns(self, pmn_file):
         try:
             with open(pmn_file, "r") as file:
                 pmns = json.load(file)
-
-            for pmn_data in pmns:
-                position = pmn_data.pop("position", None)  # Remove 'position' from pmn_data if it exists
-                if position is None:  # Generate a random position if none is provided
-                    position = np.random.uniform([100, 100], [700, 500])
-                self.nodes.append(PrimaryMassNode(config=self.config, position=position, **pmn_data))
         except FileNotFoundError:
             print(f"[Warning] PMN dataset file not found: {pmn_file}")
+            return
+        self.add_pmns(pmns)
+
+    def add_pmns(self, pmns):
+        """
+        Create PrimaryMassNodes from a PMN dataset (list of dicts, left unmodified).
+        """
+        rng = self.random.generator(INITIALIZATION_STREAM)
+        for pmn_data in pmns:
+            pmn_data = dict(pmn_data)
+            position = pmn_data.pop("position", None)  # Remove 'position' from pmn_data if it exists
+            if position is None:  # Generate a random position if none is provided
+                position = rng.uniform([100, 100], [700, 500])
+            PrimaryMassNode(position=position, store=self.store, rng=rng, **pmn_data)
 
     def get_unique_position(self, existing_positions, min_distance=50):
+        rng = self.random.generator(INITIALIZATION_STREAM)
         while True:
-            position = np.random.uniform([100, 100], [700, 500])
+            position = rng.uniform([100, 100], [700, 500])
             if all(np.linalg.norm(position - np.array(p)) > min_distance for p in existing_positions):
                 return position
 
@@ -59,101 +177,315 @@ class SimulationController:
         try:
             with open(dn_file, "r") as file:
                 dns = json.load(file)
-            for dn_data in dns:
-                attributes = dn_data.get("attributes", {})
-                self.nodes.append(DynamicNode(config=self.config, attributes=attributes))
         except FileNotFoundError:
             print(f"[Warning] DN dataset file not found: {dn_file}")
+            return
+        self.add_dns(dns)
+
+    def add_dns(self, dns):
+        """
+        Create DynamicNodes from a DN dataset (list of dicts).
+        """
+        # Compute every DN mass in one pass over the compiled attribute vectors
+        attributes = [dn_data.get("attributes", {}) for dn_data in dns]
+        masses = self.config.compute_masses(self.config.attribute_matrix(attributes))
+        rng = self.random.generator(INITIALIZATION_STREAM)
+        positions = rng.uniform([100, 100], [700, 500], (len(attributes), 2))
+        velocities = rng.uniform(-0.5, 0.5, (len(attributes), 2))
+        for dn_attributes, mass, position, velocity in zip(attributes, masses, positions, velocities):
+            DynamicNode(
+                mass=float(mass), config=self.config, attributes=dn_attributes,
+                position=position, velocity=velocity, store=self.store, rng=rng
+            )
 
-    def update(self):
-        self.force_calculator.apply_forces(self.nodes)
-        self.motion_integrator.update_positions(self.nodes)
+    def advance(self, elapsed):
+        """
+        Simulate elapsed seconds of wall time in fixed integration steps of 1 / substeps ticks,
+        at config tick_rate ticks per second. Leftover time carries over to the next call;
+        a backlog beyond max_frame_ticks is dropped instead of stepping flat out to catch up.
+        SimulationWorker drives it from the simulation thread.
 
+        :param elapsed: Wall time to simulate, in seconds.
+        :return: Number of integration steps taken.
+        """
+        substeps = self.config.substeps
+        max_steps = self.config.max_frame_ticks * substeps
+        self.accumulator += elapsed * self.config.tick_rate * substeps
+        steps = min(int(self.accumulator), max_steps)
+        self.accumulator = min(self.accumulator - steps, 1.0)
+        with self.lock:
+            for _ in range(steps):
+                self.substep()
+        return steps
+
+    def step(self):
+        """
+        Advance the simulation by exactly one tick, independent of wall time.
+        """
+        with self.lock:
+            for _ in range(self.config.substeps - self.substep_counter):
+                self.substep()
+
+    def substep(self):
+        """
+        One integration step of 1 / substeps ticks. Processing, trails and compaction
+        run once the steps add up to a whole tick.
+        """
+        self.events.tick = self.tick_counter
+        self.motion_integrator.step(self.store, self.force_calculator, 1.0 / self.config.substeps)
+
+        profiler = self.profiler
         if self.enable_dn_collisions:
-            self.force_calculator.resolve_dn_collisions(self.nodes)
+            start = profiler.start()
+            self.force_calculator.resolve_dn_collisions(self.store)
+            profiler.lap("collisions", start)
+        self.spatial_indexes.clear()
 
-        self.simulate_processing()
+        self.substep_counter += 1
+        if self.substep_counter < self.config.substeps:
+            return
+        self.substep_counter = 0
 
-        if self.window and hasattr(self.window, 'simulation_view'):
-            self.window.simulation_view.update()
+        start = profiler.start()
+        self.motion_integrator.update_trails(self.store)
+        start = profiler.lap("trails", start)
+        self.simulate_processing()
+        start = profiler.lap("processing", start)
+        if self.store.compact_if_needed():  # Reclaim slots of absorbed and expired nodes
+            self.spatial_indexes.clear()
+        self.events.flush()
+        start = profiler.lap("compaction_and_events", start)
+        if self.publish_snapshots:
+            self.publish_snapshot()
+            profiler.lap("snapshot", start)
+        profiler.maybe_dump()
 
     def simulate_processing(self):
-        for pmn in [node for node in self.nodes if isinstance(node, PrimaryMassNode)]:
+        tick = self.tick_counter
+        pmns = self.store.nodes(PMN_KIND)
+        for pmn in pmns:
             pmn.update_processing_capacity()  # Update capacity with clamping
 
-            print(f"[Processing] PMN {pmn} - Capacity: {pmn.processing_capacity:.2f}")
-
-            completed_dns = []
-            for i, (dn, time_left) in enumerate(pmn.current_dns):
-                time_left -= 1
-                pmn.current_dns[i] = (dn, time_left)
-                if time_left <= 0:
-                    completed_dns.append(dn)
-
-            for dn in completed_dns:
-                pmn.current_dns = [(d, t) for d, t in pmn.current_dns if d != dn]
+            completed = pmn.queue.pop_due(tick)
+            for dn in completed:
                 pmn.mass += dn.mass
-                print(f"[Complete] PMN {pmn} completed processing DN {dn}. New mass: {pmn.mass:.2f}")
-                if dn in self.nodes:
-                    self.nodes.remove(dn)
-
-            # Add new DNs to fully utilize capacity
-            while pmn.processing_capacity < 1.0:
-                closest_dn = self.find_closest_dn(pmn)
-                if closest_dn and closest_dn not in [d for d, _ in pmn.current_dns]:
-                    processing_time = int(closest_dn.attributes.get("render_time", 10) * 10)
-                    pmn.current_dns.append((closest_dn, processing_time))
-                    pmn.update_processing_capacity()  # Recalculate capacity after adding DN
-                    print(f"[Start] PMN {pmn} started processing DN {closest_dn}. Queue size: {len(pmn.current_dns)}")
-                else:
-                    break
+                self.events.emit(COMPLETED, pmn.node_id, dn.node_id, dn.mass)
+                self.remove_node(dn)
+            if completed:
+                self.completed_counts[pmn.node_id] = self.completed_counts.get(pmn.node_id, 0) + len(completed)
 
-        self.check_proximity_and_merge()
+        # Add new DNs to fully utilize capacity. Completions only touch DNs their PMN
+        # already owns, so claiming after all of them admits the same DNs as before.
+        self.fill_capacity(pmns)
 
-        if self.tick_counter % 10 == 0:
-            self.print_debug_info()
+        self.check_proximity_and_merge()
 
         self.tick_counter += 1
 
+    def status_lines(self):
+        """
+        Broad-phase and queue state appended to each LogSink summary.
+        """
+        counts = self.force_calculator.candidate_pair_counts
+        lines = [f"[Status] collision candidates: DN pairs {counts['dn']}, PMN pairs {counts['pmn']}"]
+        for pmn in self.store.nodes(PMN_KIND):
+            lines.append(
+                f"[Status]   PMN {pmn.node_id}: {len(pmn.queue)}/{pmn.threads} queued, capacity {pmn.processing_capacity:.2f}"
+            )
+        return lines
+
+    def check_proximity_and_merge(self):
+        """
+        Absorb unclaimed DNs that are within proximity_threshold of their closest PMN, in one
+        batched pass. Each PMN admits its closest DNs first (ties by slot) while it has threads
+        free, and merges are applied PMN by PMN in slot order.
+        """
+        proximity_threshold = self.config.proximity_threshold
+        dn_slots = self.store.slots_of_kind(DN_KIND)
+        dn_slots = dn_slots[self.ownership.unclaimed[dn_slots]]
+        closest_slots, squared_distances = self.spatial_index(PMN_KIND).nearest_many(self.store.positions[dn_slots])
+        within = (closest_slots >= 0) & (squared_distances < proximity_threshold ** 2)
+        if not within.any():
+            return
+
+        dn_slots, pmn_slots, squared_distances = dn_slots[within], closest_slots[within], squared_distances[within]
+        ordering = np.lexsort((dn_slots, squared_distances, pmn_slots))
+        dn_slots, pmn_slots = dn_slots[ordering], pmn_slots[ordering]
 
+        # Admit as many DNs per PMN as it has threads free
+        targets, group_starts = np.unique(pmn_slots, return_index=True)
+        free_threads = np.array([
+            max(self.store.handles[slot].threads - len(self.store.handles[slot].queue), 0) for slot in targets
+        ])
+        group_sizes = np.diff(np.append(group_starts, len(pmn_slots)))
+        ranks = np.arange(len(pmn_slots)) - np.repeat(group_starts, group_sizes)
+        admitted = ranks < np.repeat(free_threads, group_sizes)
+        dn_slots, pmn_slots = dn_slots[admitted], pmn_slots[admitted]
 
-    def print_debug_info(self):
-        print("=== Debug Info ===")
-        for pmn in [node for node in self.nodes if isinstance(node, PrimaryMassNode)]:
-            print(f"PMN {pmn} - Active DNs: {len(pmn.current_dns)}, Capacity: {pmn.processing_capacity:.2f}")
+        self.ownership.claim_slots(dn_slots, self.store.ids[pmn_slots])
+        self.events.emit_many(ABSORBED, self.store.ids[pmn_slots], self.store.ids[dn_slots], self.store.masses[dn_slots])
+        for dn_slot, pmn_slot in zip(dn_slots, pmn_slots):
+            self.start_processing(self.store.handles[pmn_slot], self.store.handles[dn_slot])
 
-    def check_proximity_and_merge(self):
-        proximity_threshold = self.config.get("proximity_threshold", 20)
-        for node in self.nodes[:]:
-            if isinstance(node, DynamicNode):
-                closest_pmn = self.find_closest_pmn(node)
-                if closest_pmn:
-                    distance = np.linalg.norm(closest_pmn.position - node.position)
-                    if distance < proximity_threshold:
-                        self.merge_dn_into_pmn(node, closest_pmn)
-
-    def merge_dn_into_pmn(self, dn, pmn):
-        if len(pmn.current_dns) < pmn.threads:
-            processing_time = int(dn.attributes.get("render_time", 10) * 10)
-            pmn.current_dns.append((dn, processing_time))
-        #    print(f"[Processing] PMN {pmn} started processing DN {dn}. Queue size: {len(pmn.current_dns)}")
-        #else:
-        #    print(f"[Overloaded] PMN {pmn} cannot process DN {dn}. Capacity: {len(pmn.current_dns)}/{pmn.threads}")
+    def fill_capacity(self, pmns):
+        """
+        Claim DNs for every PMN below full capacity, in PMN order. One batched k-nearest
+        query fetches CLAIM_BATCH_SIZE unclaimed candidates per PMN; a PMN skips candidates
+        claimed by an earlier PMN and only queries again if it used up its whole batch.
+        """
+        hungry = [pmn for pmn in pmns if pmn.processing_capacity < 1.0]
+        if not hungry:
+            return
+        positions = np.array([pmn.position for pmn in hungry])
+        batches, _ = self.spatial_index(DN_KIND).k_nearest_many(positions, CLAIM_BATCH_SIZE, self.ownership.unclaimed)
+        for pmn, batch in zip(hungry, batches):
+            self.claim_up_to_capacity(pmn, batch[batch >= 0])
+
+    def claim_up_to_capacity(self, pmn, candidates=None):
+        """
+        Claim the nearest unclaimed DNs for a PMN until it is at full capacity.
+        Candidates come from k-nearest queries that skip claimed DNs, CLAIM_BATCH_SIZE at a time.
+
+        :param candidates: Optional prefetched first batch of DN slots, nearest first.
+        """
+        index = self.spatial_index(DN_KIND)
+        while pmn.processing_capacity < 1.0:
+            if candidates is None:
+                candidates = index.k_nearest(pmn.position, CLAIM_BATCH_SIZE, self.ownership.unclaimed)
+            for slot in candidates:
+                dn = self.store.handles[slot]
+                if not self.ownership.claim(dn, pmn):
+                    continue  # Taken since the batch was fetched
+                self.events.emit(ADMITTED, pmn.node_id, dn.node_id, dn.mass)
+                self.start_processing(pmn, dn)
+                pmn.update_processing_capacity()  # Recalculate capacity after adding DN
+                if pmn.processing_capacity >= 1.0:
+                    return
+            if len(candidates) < CLAIM_BATCH_SIZE:
+                return  # No unclaimed DNs left
+            candidates = None
+
+    def start_processing(self, pmn, dn):
+        """
+        Queue a DN on a PMN. It completes render_time * 10 ticks from now (at least on the next tick).
+        """
+        processing_time = int(dn.attributes.get("render_time", 10) * 10)
+        pmn.queue.push(dn, self.tick_counter + max(processing_time, 1))
+        self.events.emit(STARTED, pmn.node_id, dn.node_id, dn.mass)
+
+    def publish_snapshot(self):
+        """
+        Capture what the view draws: DN positions and masses, the mass-ranked display set,
+        each displayed DN's nearest PMN (one batched spatial-index query) and trail, plus the PMNs.
+        Above config lod_threshold DNs nothing is displayed individually; the DNs are
+        binned into a density grid over the world instead, for the view's density map.
+
+        :return: The new RenderSnapshot, also published to self.snapshots.
+        """
+        with self.lock:
+            snapshot = self.capture_snapshot()
+        self.snapshots.publish(snapshot)
+        return snapshot
+
+    def capture_snapshot(self):
+        store = self.store
+        dn_slots = store.slots_of_kind(DN_KIND)
+        pmn_slots = store.slots_of_kind(PMN_KIND)
+        dn_positions = store.positions[dn_slots]
+        dn_masses = store.masses[dn_slots]
+        density = None
+        if len(dn_slots) > self.config.lod_threshold:
+            config = self.config
+            density = density_counts(dn_positions, config.world_width, config.world_height, config.lod_bin_size)
+            display = np.zeros(0, dtype=int)
+        else:
+            display = self.display_ranking.rank(store.ids[dn_slots], dn_masses, self.dn_display_limit)
+
+        targets, distances = self.spatial_index(PMN_KIND).nearest_many(dn_positions[display])
+        found = targets >= 0
+        filament_targets = np.full(len(display), NO_TARGET)
+        filament_targets[found] = np.searchsorted(pmn_slots, targets[found])  # Slot -> index into the PMN arrays
+
+        trail_points = trail_counts = None
+        if store.trails is not None:
+            trail_points, trail_counts = store.trails.gather(dn_slots[display])
+
+        return RenderSnapshot(
+            self.tick_counter, dn_positions, dn_masses, display, filament_targets, np.sqrt(distances),
+            store.positions[pmn_slots], [store.handles[slot].processing_capacity for slot in pmn_slots],
+            trail_points, trail_counts, density, self.config.lod_bin_size, store.ids[dn_slots], store.ids[pmn_slots]
+        )
 
     def find_closest_dn(self, pmn):
-        dns = [node for node in self.nodes if isinstance(node, DynamicNode)]
-        if not dns:
-            return None
-        return min(dns, key=lambda dn: np.linalg.norm(dn.position - pmn.position))
+        return self.find_closest(pmn.position, DN_KIND)
 
     def find_closest_pmn(self, dynamic_node):
-        pmns = [node for node in self.nodes if isinstance(node, PrimaryMassNode)]
-        if not pmns:
-            return None
-        return min(pmns, key=lambda pmn: np.linalg.norm(pmn.position - dynamic_node.position))
+        return self.find_closest(dynamic_node.position, PMN_KIND)
+
+    def spatial_index(self, kind):
+        """
+        Shared SpatialIndex over the nodes of one kind, built on first use after nodes moved.
+        """
+        index = self.spatial_indexes.get(kind)
+        if index is None:
+            index = self.spatial_indexes[kind] = SpatialIndex(self.store, kind)
+        return index
+
+    def find_closest(self, position, kind):
+        """
+        Closest node of the given kind to a position, or None.
+        """
+        slot = self.spatial_index(kind).nearest(position)
+        return None if slot is None else self.store.handles[slot]
+
+    def find_k_closest(self, position, kind, k, mask=None):
+        """
+        Up to k closest nodes of the given kind to a position, nearest first.
+
+        :param mask: Optional boolean array over store slots restricting the candidates.
+        """
+        return [self.store.handles[slot] for slot in self.spatial_index(kind).k_nearest(position, k, mask)]
+
+    def run_headless(self, ticks):
+        """
+        Advance the simulation by a number of ticks as fast as possible, without Qt.
+
+        :param ticks: Number of ticks to simulate.
+        :return: Elapsed wall time in seconds.
+        """
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.step()
+        return time.perf_counter() - start
+
+    def assignment_summary(self):
+        """
+        Where the DNs ended up: totals plus mass, queued and completed DNs per PMN.
+        """
+        dn_slots = self.store.slots_of_kind(DN_KIND)
+        return {
+            "ticks": self.tick_counter,
+            "dns_remaining": len(dn_slots),
+            "dns_claimed": int((~self.ownership.unclaimed[dn_slots]).sum()),
+            "dns_completed": sum(self.completed_counts.values()),
+            "pmns": [
+                {
+                    "id": pmn.node_id,
+                    "mass": float(pmn.mass),
+                    "threads": pmn.threads,
+                    "queued": len(pmn.queue),
+                    "completed": self.completed_counts.get(pmn.node_id, 0),
+                }
+                for pmn in self.store.nodes(PMN_KIND)
+            ],
+        }
 
     def run(self):
+        from ui.main_window import MainWindow
+        from PyQt5.QtWidgets import QApplication
+
         app = QApplication(sys.argv)
+        self.publish_snapshots = True
         self.window = MainWindow(self)
         self.window.show()
         sys.exit(app.exec_())
@@ -0,0 +1,69 @@
+from core.profiler import RateMeter
+import threading
+import time
+
+
+class SimulationWorker:
+    def __init__(self, controller):
+        """
+        Steps a SimulationController at config tick_rate, off the thread that draws it.
+        Every tick publishes a RenderSnapshot to controller.snapshots; other threads
+        read those and take controller.lock to change the simulation.
+
+        run() holds the loop, so a QThread can drive it in the GUI; start() runs it
+        on a plain thread (headless).
+
+        :param controller: SimulationController to step.
+        """
+        self.controller = controller
+        self.rate = RateMeter()  # Achieved ticks per second
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def run(self, ticks=None):
+        """
+        Simulate the wall time elapsed between wake-ups with controller.advance (fixed
+        integration steps, leftover time carried over, a backlog beyond max_frame_ticks
+        dropped), sleeping until the next step is due. Blocks the calling thread.
+
+        :param ticks: Ticks to simulate, None to run until stop(). A catch-up call can
+            finish a few ticks past it.
+        """
+        controller = self.controller
+        config = controller.config
+        controller.publish_snapshots = True
+        step_time = 1.0 / (config.tick_rate * config.substeps)
+        target = None if ticks is None else controller.tick_counter + ticks
+        last_time = time.perf_counter()
+        while not self.stopping.is_set() and (target is None or controller.tick_counter < target):
+            now = time.perf_counter()
+            first_tick = controller.tick_counter
+            start = controller.profiler.start()
+            if controller.advance(now - last_time):
+                controller.profiler.lap("advance", start)
+            last_time = now
+            self.rate.tick(controller.tick_counter - first_tick)
+            self.stopping.wait((1.0 - controller.accumulator) * step_time)
+
+    def start(self, ticks=None):
+        """
+        Run on a daemon thread.
+
+        :param ticks: Ticks to simulate, None to run until stop().
+        """
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, args=(ticks,), name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop stepping after the current tick; waits for the thread started by start().
+        """
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
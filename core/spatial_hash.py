@@ -0,0 +1,83 @@
+import numpy as np
+
+CELL_KEY_STRIDE = 1 << 21  # Cell coordinates are offset into [0, 2^21) per axis
+CELL_KEY_OFFSET = 1 << 20
+
+# Half of the 3x3 neighbourhood: every pair of adjacent cells is visited exactly once
+HALF_NEIGHBOURHOOD = [(1, -1), (1, 0), (1, 1), (0, 1)]
+
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        """
+        Uniform-grid spatial hash over a set of 2D points.
+
+        :param cell_size: Edge length of a grid cell. Points closer than this are
+            always in the same or in adjacent cells.
+        """
+        self.cell_size = max(float(cell_size), 1e-9)
+        self.order = np.zeros(0, dtype=int)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+
+    def cell_keys(self, positions):
+        """
+        Integer hash key of the cell containing each position.
+        """
+        cells = np.floor(positions / self.cell_size).astype(np.int64) + CELL_KEY_OFFSET
+        return cells[:, 0] * CELL_KEY_STRIDE + cells[:, 1]
+
+    def build(self, positions):
+        """
+        Bucket the points by cell (a stable sort of the cell keys).
+
+        :param positions: (N, 2) array of positions.
+        :return: self, for chaining.
+        """
+        keys = self.cell_keys(np.asarray(positions, dtype=float).reshape(-1, 2))
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        return self
+
+    def pairs_with_offset(self, dx, dy):
+        """
+        All (sorted index, sorted index) pairs between each cell and the cell at (dx, dy) from it.
+        """
+        count = len(self.sorted_keys)
+        if (dx, dy) == (0, 0):
+            # Same cell: only partners that come later in the bucket
+            low = np.arange(1, count + 1)
+            high = np.searchsorted(self.sorted_keys, self.sorted_keys, side="right")
+        else:
+            target = self.sorted_keys + (dx * CELL_KEY_STRIDE + dy)
+            low = np.searchsorted(self.sorted_keys, target, side="left")
+            high = np.searchsorted(self.sorted_keys, target, side="right")
+
+        counts = high - low
+        total = int(counts.sum())
+        first = np.repeat(np.arange(count), counts)
+        starts = np.cumsum(counts) - counts
+        second = np.repeat(low, counts) + (np.arange(total) - np.repeat(starts, counts))
+        return first, second
+
+    def candidate_pairs(self, positions=None):
+        """
+        Broad phase: every unordered pair of points in the same or adjacent cells.
+
+        :param positions: Optional (N, 2) positions to (re)build the hash from.
+        :return: (first, second) index arrays into positions with first < second,
+            sorted lexicographically.
+        """
+        if positions is not None:
+            self.build(positions)
+
+        firsts, seconds = [], []
+        for dx, dy in [(0, 0)] + HALF_NEIGHBOURHOOD:
+            first, second = self.pairs_with_offset(dx, dy)
+            firsts.append(self.order[first])
+            seconds.append(self.order[second])
+
+        first = np.concatenate(firsts)
+        second = np.concatenate(seconds)
+        first, second = np.minimum(first, second), np.maximum(first, second)
+        ordering = np.lexsort((second, first))
+        return first[ordering], second[ordering]
@@ -0,0 +1,238 @@
+import numpy as np
+from core.spatial_hash import SpatialHash, CELL_KEY_STRIDE, CELL_KEY_OFFSET
+
+POINTS_PER_CELL = 2  # Target average occupancy when the cell size is derived from the data
+MAX_RING = 3  # Grid rings searched before the remaining queries fall back to a full scan
+BRUTE_FORCE_POINTS = 128  # Up to this many points a full scan beats the grid
+QUERY_CHUNK_SIZE = 1 << 20  # (query, point) distances evaluated at once by the full scan
+
+
+class SpatialIndex:
+    def __init__(self, store, kind, cell_size=None):
+        """
+        Nearest and k-nearest lookups over the live nodes of one kind, on a uniform grid.
+        Built from a snapshot of the positions, so rebuild it after nodes move or the
+        store is compacted. Nodes removed since the build are skipped automatically.
+
+        :param store: NodeStore holding the nodes.
+        :param kind: Node kind to index (DN_KIND or PMN_KIND).
+        :param cell_size: Grid cell edge length; derived from the point density if None.
+        """
+        self.store = store
+        self.kind = kind
+        self.slots = store.slots_of_kind(kind)
+        self.positions = store.positions[self.slots]
+        self.cell_size = cell_size if cell_size is not None else self.auto_cell_size()
+        self.grid = SpatialHash(self.cell_size).build(self.positions)
+        self.cell_size = self.grid.cell_size
+        if len(self.slots):
+            cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+            self.min_cell = cells.min(axis=0)
+            self.max_cell = cells.max(axis=0)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def auto_cell_size(self):
+        """
+        Cell size giving about POINTS_PER_CELL points per cell over the bounding box.
+        """
+        if len(self.positions) < 2:
+            return 1.0
+        extent = np.maximum(self.positions.max(axis=0) - self.positions.min(axis=0), 1.0)
+        return float(np.sqrt(extent[0] * extent[1] * POINTS_PER_CELL / len(self.positions)))
+
+    def usable(self, point_index, mask=None):
+        """
+        Which of the given indexed points are still live nodes of the indexed kind
+        and selected by the mask. Only candidates are checked, never the whole index.
+
+        :param point_index: Indices into the indexed points.
+        :param mask: Optional boolean array over store slots.
+        """
+        slots = self.slots[point_index]
+        usable = self.store.kinds[slots] == self.kind
+        if mask is not None:
+            usable &= mask[slots]
+        return usable
+
+    def nearest(self, position, mask=None):
+        """
+        Slot of the node closest to a position, or None. Ties go to the lower slot.
+
+        :param position: Query position.
+        :param mask: Optional boolean array over store slots restricting the candidates.
+        """
+        slots, _ = self.k_nearest_many(np.asarray(position, dtype=float).reshape(1, 2), 1, mask)
+        return None if slots[0, 0] < 0 else int(slots[0, 0])
+
+    def nearest_many(self, positions, mask=None):
+        """
+        Closest node to each of several positions.
+
+        :param positions: (M, 2) query positions.
+        :param mask: Optional boolean array over store slots restricting the candidates.
+        :return: ((M,) slots, -1 where there is none; (M,) squared distances, inf where there is none).
+        """
+        slots, distances = self.k_nearest_many(positions, 1, mask)
+        return slots[:, 0], distances[:, 0]
+
+    def k_nearest(self, position, k, mask=None):
+        """
+        Slots of up to k nodes closest to a position, nearest first.
+
+        :param position: Query position.
+        :param k: Number of neighbours.
+        :param mask: Optional boolean array over store slots restricting the candidates.
+        """
+        slots, _ = self.k_nearest_many(np.asarray(position, dtype=float).reshape(1, 2), k, mask)
+        return slots[0][slots[0] >= 0]
+
+    def k_nearest_many(self, positions, k, mask=None):
+        """
+        Up to k closest nodes to each of several positions, nearest first (ties by slot).
+        Grid rings around each query are searched outwards until no unseen point can be
+        closer; queries still open after MAX_RING rings are finished by a full scan.
+
+        :param positions: (M, 2) query positions.
+        :param k: Number of neighbours.
+        :param mask: Optional boolean array over store slots restricting the candidates.
+        :return: ((M, k) slots padded with -1, (M, k) squared distances padded with inf).
+        """
+        queries = np.asarray(positions, dtype=float).reshape(-1, 2)
+        count = len(queries)
+        result = np.full((count, k), -1, dtype=np.int64)
+        distances = np.full((count, k), np.inf)
+        if not count or k <= 0 or not len(self.slots):
+            return result, distances
+
+        if len(self.slots) <= BRUTE_FORCE_POINTS:
+            pending = np.arange(count)
+        else:
+            pending = self.grid_search(queries, k, mask, result, distances)
+        if len(pending):
+            self.scan(queries, pending, k, mask, result, distances)
+        result[result >= 0] = self.slots[result[result >= 0]]
+        return result, distances
+
+    def grid_search(self, queries, k, mask, result, distances):
+        """
+        Ring-by-ring grid search, writing point indices and squared distances into result.
+
+        :return: Queries that are not settled after MAX_RING rings.
+        """
+        cells = np.floor(queries / self.cell_size).astype(np.int64)
+        keys = (cells[:, 0] + CELL_KEY_OFFSET) * CELL_KEY_STRIDE + (cells[:, 1] + CELL_KEY_OFFSET)
+        # Ring beyond which no indexed cell lies, per query
+        coverage = np.maximum(np.abs(cells - self.min_cell), np.abs(cells - self.max_cell)).max(axis=1)
+
+        found_queries = np.zeros(0, dtype=np.int64)
+        found_points = np.zeros(0, dtype=np.int64)
+        found_distances = np.zeros(0)
+        pending = np.arange(len(queries))
+        for ring in range(MAX_RING + 1):
+            # Every cell of the ring around every pending query in one lookup
+            key_offsets = np.array([dx * CELL_KEY_STRIDE + dy for dx, dy in ring_offsets(ring)])
+            query_index, point_index = self.cell_members((keys[pending][:, None] + key_offsets).ravel())
+            query_index = pending[query_index // len(key_offsets)]
+            keep = self.usable(point_index, mask)
+            query_index, point_index = query_index[keep], point_index[keep]
+            offsets = self.positions[point_index] - queries[query_index]
+            found_queries = np.concatenate([found_queries, query_index])
+            found_points = np.concatenate([found_points, point_index])
+            found_distances = np.concatenate([found_distances, (offsets * offsets).sum(axis=1)])
+
+            found_queries, found_points, found_distances, rank = keep_best(
+                found_queries, found_points, found_distances, k, len(queries)
+            )
+
+            # Unseen points are at least ring * cell_size away
+            kth_distance = np.full(len(queries), np.inf)
+            last = rank == k - 1
+            kth_distance[found_queries[last]] = found_distances[last]
+            settled = (kth_distance[pending] < (ring * self.cell_size) ** 2) | (coverage[pending] <= ring)
+            pending = pending[~settled]
+            if not len(pending):
+                break
+
+        result[found_queries, rank] = found_points
+        distances[found_queries, rank] = found_distances
+        return pending
+
+    def cell_members(self, target_keys):
+        """
+        All (query, point index) pairs between each target cell key and the points in that cell.
+        """
+        sorted_keys = self.grid.sorted_keys
+        low = np.searchsorted(sorted_keys, target_keys, side="left")
+        high = np.searchsorted(sorted_keys, target_keys, side="right")
+        counts = high - low
+        total = int(counts.sum())
+        starts = np.cumsum(counts) - counts
+        query_index = np.repeat(np.arange(len(target_keys)), counts)
+        sorted_index = np.repeat(low, counts) + (np.arange(total) - np.repeat(starts, counts))
+        return query_index, self.grid.order[sorted_index]
+
+    def scan(self, queries, pending, k, mask, result, distances):
+        """
+        Full scan over every usable point for the given queries, in chunks.
+        """
+        points = np.flatnonzero(self.usable(np.arange(len(self.slots)), mask))
+        if not len(points):
+            return
+        chunk = max(1, QUERY_CHUNK_SIZE // len(points))
+        width = min(k, len(points))
+        point_x, point_y = self.positions[points, 0], self.positions[points, 1]
+        for start in range(0, len(pending), chunk):
+            batch = pending[start:start + chunk]
+            offset_x = point_x[None, :] - queries[batch, 0][:, None]
+            offset_y = point_y[None, :] - queries[batch, 1][:, None]
+            squared = offset_x * offset_x
+            squared += offset_y * offset_y
+            if k == 1:
+                nearest = np.argmin(squared, axis=1)[:, None]
+            else:
+                nearest = np.argsort(squared, axis=1, kind="stable")[:, :width]
+            result[batch, :width] = points[nearest]
+            distances[batch, :width] = np.take_along_axis(squared, nearest, axis=1)
+            result[batch, width:] = -1
+            distances[batch, width:] = np.inf
+
+
+def keep_best(query_index, point_index, distances, k, count):
+    """
+    The k closest candidates of each query (ties by point index), with their rank.
+
+    :param query_index: Query of each candidate.
+    :param point_index: Point of each candidate; a point appears at most once per query.
+    :param distances: Squared distance of each candidate.
+    :param k: Candidates to keep per query.
+    :param count: Number of queries.
+    :return: (query_index, point_index, distances, rank) of the kept candidates.
+    """
+    if k == 1:
+        # Two scatter-min passes instead of a full sort: best distance, then lowest point among ties
+        best_distance = np.full(count, np.inf)
+        np.minimum.at(best_distance, query_index, distances)
+        tie = distances == best_distance[query_index]
+        best_point = np.full(count, np.iinfo(np.int64).max)
+        np.minimum.at(best_point, query_index[tie], point_index[tie])
+        queries = np.flatnonzero(best_point != np.iinfo(np.int64).max)
+        return queries, best_point[queries], best_distance[queries], np.zeros(len(queries), dtype=np.int64)
+
+    ordering = np.lexsort((point_index, distances, query_index))
+    query_index, point_index, distances = query_index[ordering], point_index[ordering], distances[ordering]
+    rank = np.arange(len(query_index)) - np.searchsorted(query_index, query_index, side="left")
+    best = rank < k
+    return query_index[best], point_index[best], distances[best], rank[best]
+
+
+def ring_offsets(ring):
+    """
+    Cell offsets at Chebyshev distance exactly ring from the centre cell.
+    """
+    if ring == 0:
+        return [(0, 0)]
+    offsets = [(dx, dy) for dx in (-ring, ring) for dy in range(-ring, ring + 1)]
+    offsets += [(dx, dy) for dy in (-ring, ring) for dx in range(-ring + 1, ring)]
+    return offsets
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class TrailBuffer:
+    def __init__(self, store, length):
+        """
+        Preallocated ring buffer of recent positions for every slot of a NodeStore.
+        Each slot stores its ring twice in a row (2 * length points), so the trail in
+        oldest-to-newest order is always one contiguous slice and can be returned as a view.
+
+        :param store: NodeStore to attach the trail columns to.
+        :param length: Number of positions kept per node.
+        """
+        self.store = store
+        self.length = max(1, int(length))
+        store.register_column("trail_points", (2 * self.length, 2), float, 0.0)
+        store.register_column("trail_heads", (), np.int32, 0)  # Next write position
+        store.register_column("trail_lengths", (), np.int32, 0)
+        store.trails = self
+
+    def push(self, slots):
+        """
+        Append the current position of each given slot to its trail, dropping the oldest.
+
+        :param slots: Array of slots to update.
+        """
+        points = self.store.columns["trail_points"]
+        heads = self.store.columns["trail_heads"]
+        lengths = self.store.columns["trail_lengths"]
+
+        head = heads[slots]
+        positions = self.store.positions[slots]
+        points[slots, head] = positions
+        points[slots, head + self.length] = positions
+        heads[slots] = (head + 1) % self.length
+        lengths[slots] = np.minimum(lengths[slots] + 1, self.length)
+
+    def view(self, slot):
+        """
+        Trail of one slot, oldest first, as a (k, 2) view into the buffer (no copy).
+        The view is only valid until the store grows or the slot is pushed again.
+        """
+        head = self.store.columns["trail_heads"][slot]
+        count = self.store.columns["trail_lengths"][slot]
+        stop = head + self.length
+        return self.store.columns["trail_points"][slot, stop - count:stop]
+
+    def views(self, slots):
+        """
+        Trails of several slots, oldest first, as a list of views.
+        """
+        return [self.view(slot) for slot in slots]
+
+    def gather(self, slots):
+        """
+        Trails of several slots as one padded copy, for batched drawing.
+
+        :param slots: Array of slots.
+        :return: ((K, length, 2) points, oldest first, of which only the last counts[i]
+            of row i are valid; (K,) counts).
+        """
+        heads = self.store.columns["trail_heads"][slots]
+        index = heads[:, None] + np.arange(self.length)
+        points = self.store.columns["trail_points"][np.asarray(slots)[:, None], index]
+        return points, self.store.columns["trail_lengths"][slots].copy()
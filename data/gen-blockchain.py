@@ -99,30 +99,48 @@ pmn_dataset = [
     },
 ]
 
-# DN dataset: Generate 300 DNs with diverse attributes
-dn_dataset = []
-attributes = list(config["attributes"].keys())
 
-for i in range(300):
-    attributes_values = {}
-    for attr in attributes:
-        min_val = config["attributes"][attr]["min"]
-        max_val = config["attributes"][attr]["max"]
+def generate(num_dns=300):
+    """
+    Build the scenario without writing any file.
 
-        # Assign random values within the defined range
-        raw_value = np.random.uniform(min_val, max_val)
-        attributes_values[attr] = max(0.0, min(1.0, (raw_value - min_val) / (max_val - min_val)))
+    :param num_dns: Number of transactions.
+    :return: (config, pmn_dataset, dn_dataset)
+    """
+    # DN dataset: DNs with diverse attributes
+    dn_dataset = []
+    attributes = list(config["attributes"].keys())
 
-    dn_dataset.append({"attributes": attributes_values})
+    for i in range(num_dns):
+        attributes_values = {}
+        for attr in attributes:
+            min_val = config["attributes"][attr]["min"]
+            max_val = config["attributes"][attr]["max"]
 
-# Save datasets
-with open("./data/config.json", "w") as config_file:
-    json.dump(config, config_file, indent=4)
+            # Assign random values within the defined range
+            raw_value = np.random.uniform(min_val, max_val)
+            attributes_values[attr] = max(0.0, min(1.0, (raw_value - min_val) / (max_val - min_val)))
 
-with open("./data/pmn_dataset.json", "w") as pmn_file:
-    json.dump(pmn_dataset, pmn_file, indent=4)
+        dn_dataset.append({"attributes": attributes_values})
 
-with open("./data/dn_dataset.json", "w") as dn_file:
-    json.dump(dn_dataset, dn_file, indent=4)
+    return config, pmn_dataset, dn_dataset
 
-print("Datasets updated: config, PMNs, and DNs")
+
+def main():
+    config, pmn_dataset, dn_dataset = generate()
+
+    # Save datasets
+    with open("./data/config.json", "w") as config_file:
+        json.dump(config, config_file, indent=4)
+
+    with open("./data/pmn_dataset.json", "w") as pmn_file:
+        json.dump(pmn_dataset, pmn_file, indent=4)
+
+    with open("./data/dn_dataset.json", "w") as dn_file:
+        json.dump(dn_dataset, dn_file, indent=4)
+
+    print("Datasets updated: config, PMNs, and DNs")
+
+
+if __name__ == "__main__":
+    main()
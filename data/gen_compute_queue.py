@@ -73,6 +73,15 @@ def generate_pmn_dataset(num_pmns=5):
         })
     return pmn_dataset
 
+# In-memory scenario
+def generate(num_dns=100, num_pmns=5):
+    """
+    Build the scenario without writing any file.
+
+    :return: (config, pmn_dataset, dn_dataset)
+    """
+    return CONFIG, generate_pmn_dataset(num_pmns), generate_dn_dataset(num_dns)
+
 # Save files
 def save_json(filename, data):
     with open(filename, "w") as file:
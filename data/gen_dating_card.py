@@ -19,63 +19,78 @@ config = {
 def normalize(value, min_val, max_val):
     return (value - min_val) / (max_val - min_val) if max_val != min_val else 0
 
-# Generate DN dataset (100,000 nodes)
-dn_dataset = []
-for i in range(300):  # Scaling up to 100,000 nodes
-    proximity = np.random.uniform(config["attributes"]["proximity"]["min"], config["attributes"]["proximity"]["max"])
-    age_difference = np.random.uniform(
-        config["attributes"]["age_difference"]["min"], config["attributes"]["age_difference"]["max"]
-    )
-    relationship_priority = np.random.randint(
-        config["attributes"]["relationship_priority"]["min"], config["attributes"]["relationship_priority"]["max"] + 1
-    )
-    open_to_kids = np.random.choice([0, 1])  # Boolean as 0 or 1
+def generate(num_dns=300):
+    """
+    Build the scenario without writing any file.
 
-    dn_dataset.append(
-        {
-            "attributes": {
-                "proximity": normalize(proximity, config["attributes"]["proximity"]["min"], config["attributes"]["proximity"]["max"]),
-                "age_difference": normalize(age_difference, config["attributes"]["age_difference"]["min"], config["attributes"]["age_difference"]["max"]),
-                "relationship_priority": normalize(relationship_priority, config["attributes"]["relationship_priority"]["min"], config["attributes"]["relationship_priority"]["max"]),
-                "open_to_kids": normalize(open_to_kids, config["attributes"]["open_to_kids"]["min"], config["attributes"]["open_to_kids"]["max"]),
+    :param num_dns: Number of dating cards.
+    :return: (config, pmn_dataset, dn_dataset)
+    """
+    # Generate DN dataset
+    dn_dataset = []
+    for i in range(num_dns):
+        proximity = np.random.uniform(config["attributes"]["proximity"]["min"], config["attributes"]["proximity"]["max"])
+        age_difference = np.random.uniform(
+            config["attributes"]["age_difference"]["min"], config["attributes"]["age_difference"]["max"]
+        )
+        relationship_priority = np.random.randint(
+            config["attributes"]["relationship_priority"]["min"], config["attributes"]["relationship_priority"]["max"] + 1
+        )
+        open_to_kids = np.random.choice([0, 1])  # Boolean as 0 or 1
+
+        dn_dataset.append(
+            {
+                "attributes": {
+                    "proximity": normalize(proximity, config["attributes"]["proximity"]["min"], config["attributes"]["proximity"]["max"]),
+                    "age_difference": normalize(age_difference, config["attributes"]["age_difference"]["min"], config["attributes"]["age_difference"]["max"]),
+                    "relationship_priority": normalize(relationship_priority, config["attributes"]["relationship_priority"]["min"], config["attributes"]["relationship_priority"]["max"]),
+                    "open_to_kids": normalize(open_to_kids, config["attributes"]["open_to_kids"]["min"], config["attributes"]["open_to_kids"]["max"]),
+                }
             }
-        }
-    )
+        )
+
+    # Generate PMN dataset with balanced grid layout
+    pmn_dataset = []
+    grid_size = 5  # Example: 5x5 grid
+    grid_spacing = 200  # Spacing between PMNs
+    start_x, start_y = 100, 100  # Starting position for the grid
+
+    for i in range(grid_size):
+        for j in range(grid_size):
+            x = start_x + i * grid_spacing
+            y = start_y + j * grid_spacing
+            preferences = {
+                "proximity": np.random.uniform(0.5, 1.0),
+                "age_difference": np.random.uniform(0.5, 1.0),
+                "relationship_priority": np.random.uniform(0.5, 1.0),
+                "open_to_kids": np.random.uniform(0.5, 1.0),
+            }
+            pmn_dataset.append({
+                "preferences": preferences,
+                "threads": np.random.randint(4, 16),
+                "position": [x, y],
+            })
+
+    return config, pmn_dataset, dn_dataset
 
-# Generate PMN dataset with balanced grid layout
-pmn_dataset = []
-grid_size = 5  # Example: 5x5 grid
-grid_spacing = 200  # Spacing between PMNs
-start_x, start_y = 100, 100  # Starting position for the grid
+def main():
+    config, pmn_dataset, dn_dataset = generate()
 
-for i in range(grid_size):
-    for j in range(grid_size):
-        x = start_x + i * grid_spacing
-        y = start_y + j * grid_spacing
-        preferences = {
-            "proximity": np.random.uniform(0.5, 1.0),
-            "age_difference": np.random.uniform(0.5, 1.0),
-            "relationship_priority": np.random.uniform(0.5, 1.0),
-            "open_to_kids": np.random.uniform(0.5, 1.0),
-        }
-        pmn_dataset.append({
-            "preferences": preferences,
-            "threads": np.random.randint(4, 16),
-            "position": [x, y],
-        })
+    # Save datasets
+    dn_file_path = "./data/dn_dataset.json"
+    pmn_file_path = "./data/pmn_dataset.json"
+    config_file_path = "./data/config.json"
 
-# Save datasets
-dn_file_path = "./data/dn_dataset.json"
-pmn_file_path = "./data/pmn_dataset.json"
-config_file_path = "./data/config.json"
+    with open(dn_file_path, "w") as dn_file:
+        json.dump(dn_dataset, dn_file, indent=4)
 
-with open(dn_file_path, "w") as dn_file:
-    json.dump(dn_dataset, dn_file, indent=4)
+    with open(pmn_file_path, "w") as pmn_file:
+        json.dump(pmn_dataset, pmn_file, indent=4)
 
-with open(pmn_file_path, "w") as pmn_file:
-    json.dump(pmn_dataset, pmn_file, indent=4)
+    with open(config_file_path, "w") as config_file:
+        json.dump(config, config_file, indent=4)
 
-with open(config_file_path, "w") as config_file:
-    json.dump(config, config_file, indent=4)
+    print(f"Generated datasets:\n- DNs: {dn_file_path}\n- PMNs: {pmn_file_path}\n- Config: {config_file_path}")
 
-print(f"Generated datasets:\n- DNs: {dn_file_path}\n- PMNs: {pmn_file_path}\n- Config: {config_file_path}")
+if __name__ == "__main__":
+    main()
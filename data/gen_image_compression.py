@@ -95,6 +95,16 @@ def generate_dns_from_pixels(pixels):
         )
     return dns
 
+def generate(num_dns=300, image_path="./assets/galaxy2.png"):
+    """
+    Build the scenario without writing any file.
+
+    :param num_dns: Number of pixels to sample from the image.
+    :return: (config, pmn_dataset, dn_dataset)
+    """
+    pixels = simplify_image(image_path, target_pixels=num_dns)
+    return config, initialize_pmns(), generate_dns_from_pixels(pixels)
+
 def save_datasets(pmns, dns, config, output_dir="./data"):
     """
     Saves the PMN, DN, and config datasets as JSON files.
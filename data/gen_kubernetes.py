@@ -17,9 +17,7 @@ config = {
     "mode": "multi_process",
 }
 
-# PMN dataset: Representing Kubernetes nodes
-pmn_dataset = []
-attributes = list(config["attributes"].keys())
+# Evenly distributed PMN positions
 positions = [
     [200, 200],  # Top-left
     [600, 200],  # Top-right
@@ -29,42 +27,64 @@ positions = [
     [400, 400],  # Center
 ]
 
-# Limit PMNs to 6 and distribute them evenly on screen
-for i in range(6):  # 6 PMNs
-    preferences = {attr: 0.0 for attr in attributes}  # Default no weight
-    preferences[attributes[i % len(attributes)]] = 1.0  # Strong preference for specific attribute
-
-    pmn_dataset.append({
-        "id": f"Node_{i+1}",
-        "threads": np.random.randint(4, 9),  # Random thread count between 4 and 8
-        "preferences": preferences,
-        "position": positions[i]  # Evenly distributed positions
-    })
-
-# DN dataset: Representing Kubernetes pods/workloads
-dn_dataset = []
-for i in range(300):  # 300 DNs
-    attributes_values = {}
-    for attr in attributes:
-        min_val = config["attributes"][attr]["min"]
-        max_val = config["attributes"][attr]["max"]
-
-        # Assign random values within the defined range
-        raw_value = np.random.uniform(min_val, max_val)
-        attributes_values[attr] = max(0.0, min(1.0, (raw_value - min_val) / (max_val - min_val)))
-
-    dn_dataset.append({"attributes": attributes_values})
-
-# Save datasets
-output_dir = "./data/"
-datasets = {
-    "config.json": config,
-    "pmn_dataset.json": pmn_dataset,
-    "dn_dataset.json": dn_dataset
-}
 
-for filename, data in datasets.items():
-    with open(output_dir + filename, "w") as file:
-        json.dump(data, file, indent=4)
+def generate(num_dns=300):
+    """
+    Build the scenario without writing any file.
+
+    :param num_dns: Number of pods/workloads.
+    :return: (config, pmn_dataset, dn_dataset)
+    """
+    # PMN dataset: Representing Kubernetes nodes
+    pmn_dataset = []
+    attributes = list(config["attributes"].keys())
+
+    # Limit PMNs to 6 and distribute them evenly on screen
+    for i in range(6):  # 6 PMNs
+        preferences = {attr: 0.0 for attr in attributes}  # Default no weight
+        preferences[attributes[i % len(attributes)]] = 1.0  # Strong preference for specific attribute
+
+        pmn_dataset.append({
+            "id": f"Node_{i+1}",
+            "threads": np.random.randint(4, 9),  # Random thread count between 4 and 8
+            "preferences": preferences,
+            "position": positions[i]  # Evenly distributed positions
+        })
+
+    # DN dataset: Representing Kubernetes pods/workloads
+    dn_dataset = []
+    for i in range(num_dns):
+        attributes_values = {}
+        for attr in attributes:
+            min_val = config["attributes"][attr]["min"]
+            max_val = config["attributes"][attr]["max"]
+
+            # Assign random values within the defined range
+            raw_value = np.random.uniform(min_val, max_val)
+            attributes_values[attr] = max(0.0, min(1.0, (raw_value - min_val) / (max_val - min_val)))
+
+        dn_dataset.append({"attributes": attributes_values})
+
+    return config, pmn_dataset, dn_dataset
+
+
+def main():
+    config, pmn_dataset, dn_dataset = generate()
+
+    # Save datasets
+    output_dir = "./data/"
+    datasets = {
+        "config.json": config,
+        "pmn_dataset.json": pmn_dataset,
+        "dn_dataset.json": dn_dataset
+    }
+
+    for filename, data in datasets.items():
+        with open(output_dir + filename, "w") as file:
+            json.dump(data, file, indent=4)
+
+    print("Datasets for Kubernetes-inspired GREP setup have been successfully generated!")
+
 
-"Datasets for Kubernetes-inspired GREP setup have been successfully generated!"
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,74 @@
 # main.py
 from core.simulation_controller import SimulationController
+from core.config import SimulationConfig
+from core.simulation_worker import SimulationWorker
+import argparse
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SoL Gravitas simulation")
+    parser.add_argument("--headless", action="store_true", help="Run without Qt as fast as possible")
+    parser.add_argument("--ticks", type=int, default=1000, help="Ticks to simulate in headless mode")
+    parser.add_argument("--realtime", action="store_true", help="Headless: step on a worker thread at the config tick rate")
+    parser.add_argument("--config", default="data/config.json", help="Config JSON file")
+    parser.add_argument("--dns", default="data/dn_dataset.json", help="DN dataset JSON file")
+    parser.add_argument("--pmns", default="data/pmn_dataset.json", help="PMN dataset JSON file")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible run (overrides the config's)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the per-tick processing log in headless mode")
+    parser.add_argument("--profile", metavar="PATH", default=None, help="Profile each phase and dump the timings to PATH (JSON)")
+    return parser.parse_args()
+
+
+def print_summary(summary, elapsed):
+    ticks_per_second = summary["ticks"] / elapsed if elapsed > 0 else float("inf")
+    print(f"Simulated {summary['ticks']} ticks in {elapsed:.2f}s ({ticks_per_second:.1f} ticks/sec)")
+    print(
+        f"DNs remaining: {summary['dns_remaining']} (claimed: {summary['dns_claimed']}), "
+        f"completed: {summary['dns_completed']}"
+    )
+    for pmn in summary["pmns"]:
+        print(
+            f"PMN {pmn['id']}: mass {pmn['mass']:.2f}, threads {pmn['threads']}, "
+            f"queued {pmn['queued']}, completed {pmn['completed']}"
+        )
+
+
+def print_profile(phases):
+    print(f"{'phase':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'count':>8}")
+    for phase, stats in sorted(phases.items()):
+        if stats["window"]:
+            print(f"{phase:<22} {stats['p50_ms']:8.3f} {stats['p95_ms']:8.3f} {stats['p99_ms']:8.3f} {stats['count']:8d}")
+
 
 def main():
-    simulation = SimulationController()
-    simulation.run()
+    args = parse_args()
+    config = SimulationConfig.load(args.config)
+    if args.seed is not None:
+        config.seed = args.seed
+
+    simulation = SimulationController(config=config, dn_file=args.dns, pmn_file=args.pmns)
+    if args.profile:
+        simulation.profiler.enabled = True
+        simulation.profiler.dump_path = args.profile
+    if args.headless:
+        simulation.verbose = args.verbose
+        if args.realtime:
+            worker = SimulationWorker(simulation)
+            start = time.perf_counter()
+            worker.start(args.ticks)
+            worker.thread.join()
+            elapsed = time.perf_counter() - start
+        else:
+            elapsed = simulation.run_headless(args.ticks)
+        print(f"Seed: {simulation.random.seed}")
+        print_summary(simulation.assignment_summary(), elapsed)
+        if simulation.profiler.enabled:
+            print_profile(simulation.profiler.summary())
+            if simulation.profiler.dump_path:
+                simulation.profiler.dump()
+    else:
+        simulation.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
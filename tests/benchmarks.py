@@ -0,0 +1,246 @@
+"""
+Kernel and end-to-end benchmarks for the core engines.
+
+    python tests/benchmarks.py --quick
+    python tests/benchmarks.py --output results.json --baseline tests/benchmark_baseline.json
+    python tests/benchmarks.py --save-baseline tests/benchmark_baseline.json
+
+Every case is built from a fixed seed. Results are written as JSON; with --baseline
+each kernel is compared against the stored median and the run fails (exit code 1)
+if any kernel is slower than the baseline by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import math
+import argparse
+import platform
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import SimulationConfig
+from core.force_calculator import ForceCalculator
+from core.motion_integrator import MotionIntegrator
+from core.node import DynamicNode, PrimaryMassNode
+from core.node_store import NodeStore, DN_KIND
+from core.simulation_controller import SimulationController
+
+DN_COUNTS = [100, 1000, 10000, 100000, 1000000]
+PMN_COUNTS = [5, 100, 1000, 10000]
+QUICK_DN_COUNTS = [100, 1000, 10000]
+QUICK_PMN_COUNTS = [5, 100]
+MAX_PAIRS = 2e8  # Skip cases whose exact DN x PMN force pass would exceed this many pairs
+AREA_PER_DN = 400  # World area per DN, so density (and collision load) stays constant across N
+CHARGE_SAMPLES = 1000  # calculate_gravitational_charge calls timed per repeat
+ATTRIBUTES = ["price", "rating", "availability", "size", "color"]
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA = 1e-4  # Seconds; slowdowns smaller than this are timer noise, never regressions
+
+
+def benchmark_config(dn_count, force_mode, seed):
+    side = max(800.0, math.sqrt(dn_count * AREA_PER_DN))
+    return {
+        "seed": seed,
+        "attributes": {name: {"weight": 0.4 + 0.1 * i, "min": 0, "max": 1} for i, name in enumerate(ATTRIBUTES)},
+        "invert_attributes": [],
+        "physics": {"force_mode": force_mode, "world_width": side, "world_height": side * 0.75},
+    }
+
+
+def build_scene(store, config, dn_count, pmn_count, seed):
+    """
+    Fill a store with seeded DNs and PMNs spread over the configured world.
+    """
+    rng = np.random.RandomState(seed)
+    size = np.array([config.world_width, config.world_height])
+    for position in rng.uniform(0.1, 0.9, (pmn_count, 2)) * size:
+        preferences = dict(zip(ATTRIBUTES, rng.uniform(0, 1, len(ATTRIBUTES)).round(3)))
+        PrimaryMassNode(position=position, store=store, rng=rng, threads=8, preferences=preferences)
+
+    attributes = rng.uniform(0, 1, (dn_count, len(ATTRIBUTES)))
+    attribute_dicts = [dict(zip(ATTRIBUTES, row)) for row in attributes]
+    masses = config.compute_masses(config.attribute_matrix(attribute_dicts))
+    positions = rng.uniform(0, 1, (dn_count, 2)) * size
+    velocities = rng.uniform(-1, 1, (dn_count, 2))
+    for dn_attributes, mass, position, velocity in zip(attribute_dicts, masses, positions, velocities):
+        DynamicNode(
+            mass=float(mass), config=config, attributes=dn_attributes,
+            position=position, velocity=velocity, store=store
+        )
+
+
+def time_calls(function, repeats, setup=None):
+    """
+    Run function repeats times (after setup, untimed) and return the durations in seconds.
+    """
+    durations = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def snapshot(store):
+    positions = store.positions.copy()
+    velocities = store.velocities.copy()
+
+    def restore():
+        store.positions[:len(positions)] = positions
+        store.velocities[:len(velocities)] = velocities
+    return restore
+
+
+def kernel_cases(dn_count, pmn_count, seed, repeats):
+    """
+    Time the store-level kernels on one scene. Yields (kernel, durations, extra fields).
+    """
+    force_mode = "barnes_hut" if pmn_count >= 1000 else "exact"
+    config = SimulationConfig(benchmark_config(dn_count, force_mode, seed))
+    store = NodeStore(capacity=dn_count + pmn_count)
+    build_scene(store, config, dn_count, pmn_count, seed)
+    force_calculator = ForceCalculator(config=config)
+    motion_integrator = MotionIntegrator(config=config)
+    restore = snapshot(store)
+
+    force_calculator.apply_forces(store)  # Warm-up: builds the charge rows
+    yield "apply_forces", time_calls(lambda: force_calculator.apply_forces(store), repeats, restore), {"mode": force_mode}
+
+    dns = store.nodes(DN_KIND)
+    pmns = [node for node in store.nodes() if node.kind != DN_KIND]
+    rng = np.random.RandomState(seed)
+    pairs = [(dns[i], pmns[j]) for i, j in zip(
+        rng.randint(0, len(dns), CHARGE_SAMPLES), rng.randint(0, len(pmns), CHARGE_SAMPLES)
+    )]
+
+    def charges():
+        for dn, pmn in pairs:
+            force_calculator.calculate_gravitational_charge(dn, pmn)
+    yield "calculate_gravitational_charge", time_calls(charges, repeats), {"calls": CHARGE_SAMPLES}
+
+    yield "resolve_dn_collisions", time_calls(lambda: force_calculator.resolve_dn_collisions(store), repeats, restore), {}
+    yield "update_positions", time_calls(lambda: motion_integrator.update_positions(store), repeats, restore), {}
+
+
+def processing_case(dn_count, pmn_count, seed, repeats):
+    """
+    Time consecutive SimulationController.simulate_processing calls on a seeded scene.
+    """
+    force_mode = "barnes_hut" if pmn_count >= 1000 else "exact"
+    controller = SimulationController(config=benchmark_config(dn_count, force_mode, seed), dns=[], pmns=[])
+    controller.verbose = False
+    build_scene(controller.store, controller.config, dn_count, pmn_count, seed)
+    controller.simulate_processing()  # Warm-up: first admissions and spatial indexes
+    return time_calls(controller.simulate_processing, repeats)
+
+
+def run_benchmarks(dn_counts, pmn_counts, seed, repeats, max_pairs, kernels):
+    results = []
+    for dn_count in dn_counts:
+        for pmn_count in pmn_counts:
+            if pmn_count < 1000 and dn_count * pmn_count > max_pairs:
+                print(f"[Skip] N={dn_count} P={pmn_count}: exceeds {max_pairs:.0e} pairs")
+                continue
+
+            cases = []
+            if kernels & {"apply_forces", "calculate_gravitational_charge", "resolve_dn_collisions", "update_positions"}:
+                cases.extend(kernel_cases(dn_count, pmn_count, seed, repeats))
+            if "simulate_processing" in kernels:
+                cases.append(("simulate_processing", processing_case(dn_count, pmn_count, seed, repeats), {}))
+
+            for kernel, durations, extra in cases:
+                if kernel not in kernels:
+                    continue
+                result = {
+                    "kernel": kernel, "dns": dn_count, "pmns": pmn_count, "repeats": repeats,
+                    "median_s": float(np.median(durations)), "min_s": float(np.min(durations)),
+                    "mean_s": float(np.mean(durations)), **extra
+                }
+                results.append(result)
+                print(f"{kernel:<32} N={dn_count:<8} P={pmn_count:<6} median {result['median_s'] * 1e3:10.3f} ms")
+    return results
+
+
+def result_key(result):
+    return f"{result['kernel']}|{result['dns']}|{result['pmns']}"
+
+
+def compare(results, baseline, tolerance, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Flag results whose median is slower than the baseline by more than tolerance
+    (and by more than min_delta seconds).
+
+    :return: List of (key, baseline median, new median, ratio) for every regression.
+    """
+    baseline_medians = {result_key(result): result["median_s"] for result in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        reference = baseline_medians.get(result_key(result))
+        if reference is None or reference <= 0:
+            continue
+        ratio = result["median_s"] / reference
+        regressed = ratio > 1 + tolerance and result["median_s"] - reference > min_delta
+        status = "REGRESSION" if regressed else "ok"
+        print(f"{result_key(result):<48} {reference * 1e3:10.3f} -> {result['median_s'] * 1e3:10.3f} ms  x{ratio:5.2f}  {status}")
+        if regressed:
+            regressions.append((result_key(result), reference, result["median_s"], ratio))
+    return regressions
+
+
+def parse_counts(text):
+    return [int(float(value)) for value in text.split(",") if value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Gravitas core engines")
+    parser.add_argument("--quick", action="store_true", help=f"Small matrix: N={QUICK_DN_COUNTS}, P={QUICK_PMN_COUNTS}")
+    parser.add_argument("--dns", type=parse_counts, default=None, help="Comma-separated DN counts, e.g. 1e2,1e4")
+    parser.add_argument("--pmns", type=parse_counts, default=None, help="Comma-separated PMN counts")
+    parser.add_argument("--kernels", default=None, help="Comma-separated kernel names to run (all by default)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-pairs", type=float, default=MAX_PAIRS)
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results (JSON)")
+    parser.add_argument("--baseline", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, help="Ignore slowdowns below this many seconds")
+    parser.add_argument("--save-baseline", default=None, help="Also write the results as a new baseline file")
+    args = parser.parse_args()
+
+    dn_counts = args.dns or (QUICK_DN_COUNTS if args.quick else DN_COUNTS)
+    pmn_counts = args.pmns or (QUICK_PMN_COUNTS if args.quick else PMN_COUNTS)
+    all_kernels = {
+        "apply_forces", "calculate_gravitational_charge", "resolve_dn_collisions",
+        "update_positions", "simulate_processing"
+    }
+    kernels = set(args.kernels.split(",")) if args.kernels else all_kernels
+
+    results = run_benchmarks(dn_counts, pmn_counts, args.seed, args.repeats, args.max_pairs, kernels)
+    report = {
+        "meta": {
+            "timestamp": time.time(), "seed": args.seed, "repeats": args.repeats,
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Parity checks of the vectorized kernels against the per-node loops they replaced.
+
+    python tests/parity_checks.py
+    python tests/parity_checks.py --seed 3
+
+Each check builds a seeded scene, runs the store-level kernel and a transcription
+of the original per-node loop on copies of the same state, and compares the
+results. The run fails (exit code 1) if any check exceeds its tolerance.
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import SimulationConfig
+from core.force_calculator import ForceCalculator
+from core.node import DynamicNode, PrimaryMassNode
+from core.node_store import NodeStore, DN_KIND, PMN_KIND
+from core.simulation_controller import SimulationController
+
+FORCE_TOLERANCE = 1e-12  # Largest velocity difference, relative to the largest velocity
+FORCE_DNS = 300
+FORCE_PMNS = 12
+COLLISION_TOLERANCE = 1e-12  # Largest position or velocity difference, relative to the largest value
+CLUSTER_DNS = 400
+CLUSTER_SIDE = 60  # Side of the square the cluster DNs are spread over, in pixels
+REPLAY_TICKS = 50
+REPLAY_DNS = 200
+CONFIG = {
+    "attributes": {
+        "price": {"weight": 0.7, "min": 10, "max": 200},
+        "rating": {"weight": 0.8, "min": 0, "max": 5},
+        "availability": {"weight": 0.6, "min": 0, "max": 1},
+        "color": {"weight": 0.4, "min": 0, "max": 1},
+    },
+    "invert_attributes": ["price"],
+}
+CHANGED_CONFIG = {
+    "attributes": {
+        "price": {"weight": 0.7, "min": 0, "max": 400},
+        "rating": {"weight": 0.8, "min": 1, "max": 5},
+        "availability": {"weight": 0.6, "min": 0, "max": 1},
+    },
+    "invert_attributes": ["rating", "size"],
+}
+
+
+def build_force_scene(config, seed):
+    """
+    Seeded DNs and PMNs with attribute values spread over the configured ranges.
+    One PMN preference ("size") is not in the config, as in the shipped datasets.
+    """
+    rng = np.random.RandomState(seed)
+    store = NodeStore()
+    for position in rng.uniform(100, 700, (FORCE_PMNS, 2)):
+        preferences = {"price": rng.uniform(0, 1), "rating": rng.uniform(0, 1), "size": rng.uniform(0, 1)}
+        if rng.rand() < 0.5:
+            preferences["color"] = rng.uniform(0, 1)
+        PrimaryMassNode(position=position, mass=rng.uniform(20, 40), store=store, threads=4, preferences=preferences)
+    for position in rng.uniform(0, 800, (FORCE_DNS, 2)):
+        attributes = {"price": rng.uniform(10, 200), "rating": rng.uniform(0, 5), "availability": rng.uniform(0, 1)}
+        DynamicNode(
+            config=config, attributes=attributes, position=position,
+            velocity=rng.uniform(-25, 25, 2), store=store
+        )
+    return store
+
+
+def reference_charge(config_data, dn, pmn):
+    """
+    Gravitational charge as the original calculate_gravitational_charge computed it
+    from the raw config dict.
+    """
+    charge = 0.0
+    for attribute, weight in pmn.attributes.get("preferences", {}).items():
+        dn_value = dn.attributes.get(attribute, 0)
+        attribute_config = config_data["attributes"].get(attribute, {})
+        min_value = attribute_config.get("min", 0)
+        max_value = attribute_config.get("max", 1)
+        if max_value != min_value:
+            dn_value = (dn_value - min_value) / (max_value - min_value)
+        if attribute in config_data["invert_attributes"]:
+            dn_value = 1.0 - dn_value
+        charge += weight * dn_value
+    return charge
+
+
+def reference_velocities(config_data, dns, pmns, draws):
+    """
+    The original per-node apply_forces loop, with its np.random draws replaced by
+    the given uniforms (the same three per DN the vectorized kernel takes).
+    """
+    velocities = []
+    for dn, draw in zip(dns, draws):
+        total_force = np.zeros(2)
+        for pmn in pmns:
+            r_vector = pmn.position - dn.position
+            distance = np.linalg.norm(r_vector) + 5
+            total_force += (1.2 * reference_charge(config_data, dn, pmn)) * r_vector / (distance ** 1.9)
+
+        force_magnitude = np.linalg.norm(total_force)
+        if force_magnitude > 15:
+            total_force = (total_force / force_magnitude) * 15
+        velocity = dn.velocity + (total_force / dn.mass) * 100
+
+        tangent_vector = np.array([-velocity[1], velocity[0]])
+        tangent_norm = np.linalg.norm(tangent_vector)
+        if tangent_norm != 0:
+            velocity += tangent_vector / tangent_norm * (0.005 + (0.01 - 0.005) * draw[0])
+        velocity += (draw[1:] - 0.5) * 0.2
+
+        speed = np.linalg.norm(velocity)
+        if speed > 20:
+            velocity = (velocity / speed) * 20
+        velocities.append(velocity * 0.998)
+    return np.array(velocities)
+
+
+def check_force_kernel(seed):
+    """
+    ForceCalculator.compute_dn_forces + compute_dn_velocities against the original loop.
+
+    :return: Largest velocity difference relative to the largest velocity.
+    """
+    config = SimulationConfig(CONFIG)
+    store = build_force_scene(config, seed)
+    dn_slots = store.slots_of_kind(DN_KIND)
+    draws = np.random.RandomState(seed + 1).random_sample((len(dn_slots), 3))
+
+    expected = reference_velocities(CONFIG, store.nodes(DN_KIND), store.nodes(PMN_KIND), draws)
+    calculator = ForceCalculator(config)
+    actual = calculator.compute_dn_velocities(
+        store.velocities[dn_slots], store.masses[dn_slots], calculator.compute_dn_forces(store, dn_slots), 1.0, draws
+    )
+    return np.abs(actual - expected).max() / np.abs(expected).max()
+
+
+def check_config_change(seed):
+    """
+    Charges after SimulationConfig.update (new ranges, inversions and attribute axis)
+    against the original calculation from the new config dict.
+
+    :return: Largest charge difference relative to the largest charge.
+    """
+    config = SimulationConfig(CONFIG)
+    store = build_force_scene(config, seed)
+    dn_slots = store.slots_of_kind(DN_KIND)
+    pmn_slots = store.slots_of_kind(PMN_KIND)
+    charge_matrix = ForceCalculator(config).charge_matrix
+    charge_matrix.charges(store, dn_slots, pmn_slots)
+
+    config.update(CHANGED_CONFIG)
+    actual = charge_matrix.charges(store, dn_slots, pmn_slots)
+    expected = np.array([
+        [reference_charge(CHANGED_CONFIG, dn, pmn) for pmn in store.nodes(PMN_KIND)] for dn in store.nodes(DN_KIND)
+    ])
+    return np.abs(actual - expected).max() / np.abs(expected).max()
+
+
+def build_cluster(seed, count=CLUSTER_DNS):
+    """
+    Seeded DNs packed densely enough that most of them touch several others.
+    """
+    rng = np.random.RandomState(seed)
+    config = SimulationConfig(CONFIG)
+    store = NodeStore()
+    for position in rng.uniform(0, CLUSTER_SIDE, (count, 2)):
+        DynamicNode(
+            mass=rng.uniform(1, 5), config=config, attributes={"rating": 1},
+            position=position, velocity=rng.uniform(-2, 2, 2), store=store
+        )
+    return config, store
+
+
+def reference_collision(node_a, node_b):
+    """
+    The original elastic_collision, for two nodes that do not coincide.
+    """
+    normal_vector = node_b.position - node_a.position
+    distance = np.linalg.norm(normal_vector)
+    normal_vector /= distance
+    overlap = 0.5 * ((node_a.mass ** (1/3)) + (node_b.mass ** (1/3))) - distance
+    if overlap > 0:
+        correction = normal_vector * overlap
+        node_a.position -= correction * (node_b.mass / (node_a.mass + node_b.mass))
+        node_b.position += correction * (node_a.mass / (node_a.mass + node_b.mass))
+
+    velocity_along_normal = np.dot(node_a.velocity - node_b.velocity, normal_vector)
+    if velocity_along_normal > 0:
+        return
+    impulse = (-(1 + 0.9) * velocity_along_normal) / ((1 / node_a.mass) + (1 / node_b.mass)) * normal_vector
+    node_a.velocity += impulse / node_a.mass
+    node_b.velocity -= impulse / node_b.mass
+    node_a.velocity *= 0.98
+    node_b.velocity *= 0.98
+
+
+def state_error(expected, actual):
+    """
+    Largest position or velocity difference between two stores, relative to the largest value.
+    """
+    count = expected.count
+    errors = []
+    for name in ("positions", "velocities"):
+        reference = expected.columns[name][:count]
+        errors.append(np.abs(actual.columns[name][:count] - reference).max() / np.abs(reference).max())
+    return max(errors)
+
+
+def check_sequential_collisions(seed):
+    """
+    resolve_dn_collisions with collision_mode "sequential" against the original pairwise i < j loop.
+    """
+    _, expected = build_cluster(seed)
+    dns = expected.nodes(DN_KIND)
+    for i, node_a in enumerate(dns):
+        for node_b in dns[i + 1:]:
+            distance = np.linalg.norm(node_b.position - node_a.position)
+            if distance < 1.5 * ((node_a.mass ** (1/3)) + (node_b.mass ** (1/3))):
+                reference_collision(node_a, node_b)
+
+    config, actual = build_cluster(seed)
+    config.collision_mode = "sequential"
+    ForceCalculator(config).resolve_dn_collisions(actual)
+    return state_error(expected, actual)
+
+
+def check_disjoint_contacts(seed):
+    """
+    One batched elastic_collisions pass over node-disjoint contacts (the case where a
+    Jacobi pass must be exact) against the original elastic_collision per pair.
+    """
+    _, expected = build_cluster(seed)
+    dns = expected.nodes(DN_KIND)
+    for node_a, node_b in zip(dns[0::2], dns[1::2]):
+        reference_collision(node_a, node_b)
+
+    config, actual = build_cluster(seed)
+    slots = actual.slots_of_kind(DN_KIND)
+    pairs = len(slots) // 2
+    ForceCalculator(config).elastic_collisions(actual, slots[0:2 * pairs:2], slots[1:2 * pairs:2])
+    return state_error(expected, actual)
+
+
+def run_seeded(seed):
+    """
+    A small seeded simulation with DN collisions on, after REPLAY_TICKS ticks.
+    """
+    config = dict(CONFIG, seed=seed)
+    dns = [{"attributes": {"price": 10 + i % 190, "rating": i % 5, "availability": 0.5}} for i in range(REPLAY_DNS)]
+    pmns = [{"threads": 4, "preferences": {"price": 0.5, "rating": 0.8}} for _ in range(3)]
+    simulation = SimulationController(config=config, dns=dns, pmns=pmns)
+    simulation.verbose = False
+    simulation.enable_dn_collisions = True
+    for _ in range(REPLAY_TICKS):
+        simulation.step()
+    return simulation.store.positions[:simulation.store.count].copy()
+
+
+def check_seeded_replay(seed):
+    """
+    Two simulations built the same way with the same seed, in one process, must not
+    diverge: random draws are keyed per simulation, not on process-wide node IDs.
+    """
+    first = run_seeded(seed)
+    second = run_seeded(seed)
+    if first.shape != second.shape:
+        return np.inf
+    return np.abs(first - second).max() / np.abs(first).max()
+
+
+def shard_draws(calculator, store, dns, pairs):
+    """
+    Perturbation draws per DN and collision-normal draws per pair, by node IDs.
+    """
+    dn_slots = [dn.slot for dn in dns]
+    perturbations = dict(zip([dn.node_id for dn in dns], calculator.perturbation_draws(store, dn_slots)))
+    first = np.array([node_a.slot for node_a, _ in pairs], dtype=int)
+    second = np.array([node_b.slot for _, node_b in pairs], dtype=int)
+    keys = [(node_a.node_id, node_b.node_id) for node_a, node_b in pairs]
+    return perturbations, dict(zip(keys, calculator.normal_draws(store, first, second)))
+
+
+def check_sharded_draws(seed):
+    """
+    Perturbation and collision-normal draws after moving half of the DNs into a second
+    shard with adopt(), against the same draws from the unsharded store.
+    """
+    dns = [{"attributes": {"rating": 1}}] * REPLAY_DNS
+    simulation = SimulationController(config=dict(CONFIG, seed=seed), dns=dns, pmns=[])
+    simulation.verbose = False
+    store = simulation.store
+    calculator = simulation.force_calculator
+    calculator.steps = REPLAY_TICKS
+    dns = store.nodes(DN_KIND)
+    halves = [dns[0::2], dns[1::2]]
+    shard_pairs = [list(zip(half[0::2], half[1::2])) for half in halves]
+    expected_perturbations, expected_normals = shard_draws(calculator, store, dns, shard_pairs[0] + shard_pairs[1])
+
+    shard = NodeStore(shard_of=store)
+    for dn in halves[1]:
+        shard.adopt(dn)
+    store.compact()
+    errors = []
+    for shard_store, half, pairs in zip((store, shard), halves, shard_pairs):
+        perturbations, normals = shard_draws(calculator, shard_store, half, pairs)
+        errors += [np.abs(draw - expected_perturbations[node_id]).max() for node_id, draw in perturbations.items()]
+        errors += [np.abs(draw - expected_normals[pair]).max() for pair, draw in normals.items()]
+    return max(errors)
+
+
+CHECKS = [
+    ("force kernel vs per-node loop", check_force_kernel, FORCE_TOLERANCE),
+    ("charges after a config change", check_config_change, FORCE_TOLERANCE),
+    ("sequential collisions vs i < j loop", check_sequential_collisions, COLLISION_TOLERANCE),
+    ("batched disjoint contacts vs per pair", check_disjoint_contacts, COLLISION_TOLERANCE),
+    ("same seed in one process", check_seeded_replay, 0.0),
+    ("sharded draws vs unsharded", check_sharded_draws, 0.0),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the vectorized kernels with their per-node references")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failed = 0
+    for name, check, tolerance in CHECKS:
+        error = check(args.seed)
+        passed = error <= tolerance
+        failed += not passed
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<40} error {error:.3e} (tolerance {tolerance:.0e})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
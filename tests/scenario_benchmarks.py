@@ -0,0 +1,181 @@
+"""
+Scenario throughput benchmarks built from the data/gen_*.py generators.
+
+    python tests/scenario_benchmarks.py --quick
+    python tests/scenario_benchmarks.py --scenarios kubernetes,blockchain --scales 300,3000 --output scenarios.json
+
+Each scenario is generated in memory (nothing in data/ is overwritten) at every
+scale, then run headless until it drains (no DNs left), settles (the DN count has
+not changed for --settle-ticks ticks) or hits the tick budget. Every case runs in
+a fresh process so its peak RSS is its own.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not reported
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.config import SimulationConfig
+from core.node_store import DN_KIND
+from core.simulation_controller import SimulationController
+
+SCENARIOS = {
+    "compute_queue": "gen_compute_queue.py",
+    "kubernetes": "gen_kubernetes.py",
+    "blockchain": "gen-blockchain.py",
+    "e_commerce": "gen_e_commerce.py",
+    "dating_card": "gen_dating_card.py",
+    "image_compression": "gen_image_compression.py",
+}
+SCALES = [300, 3000, 30000]
+QUICK_SCALES = [300, 3000]
+DEFAULT_MAX_TICKS = 5000
+DEFAULT_SETTLE_TICKS = 500  # Ticks without a DN leaving the simulation that count as equilibrium
+
+
+def load_generator(scenario):
+    """
+    Import a data/ generator by file name (some are not valid module names).
+
+    :return: The generator's generate(num_dns) function.
+    """
+    path = os.path.join(ROOT, "data", SCENARIOS[scenario])
+    spec = importlib.util.spec_from_file_location(f"scenario_{scenario}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.generate
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MiB, None where getrusage is unavailable.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # Bytes on macOS, KiB elsewhere
+
+
+def run_scenario(scenario, num_dns, seed, max_ticks, settle_ticks):
+    """
+    Generate one scenario and run it headless. Runs in a worker process.
+
+    :return: Result dict.
+    """
+    os.chdir(ROOT)  # Generators resolve assets relative to the repository root
+    np.random.seed(seed)  # The generators draw from the global RNG
+    start = time.perf_counter()
+    config, pmn_dataset, dn_dataset = load_generator(scenario)(num_dns)
+    config = SimulationConfig(config)
+    config.seed = seed
+    simulation = SimulationController(config=config, dns=dn_dataset, pmns=pmn_dataset)
+    simulation.verbose = False
+    setup_s = time.perf_counter() - start
+    initial_dns = len(simulation.store.slots_of_kind(DN_KIND))
+
+    drain_ticks = drain_s = None
+    remaining = initial_dns
+    last_change = 0
+    start = time.perf_counter()
+    while simulation.tick_counter < max_ticks:
+        simulation.step()
+        count = len(simulation.store.slots_of_kind(DN_KIND))
+        if count != remaining:
+            remaining, last_change = count, simulation.tick_counter
+        if remaining == 0:
+            drain_ticks, drain_s = simulation.tick_counter, time.perf_counter() - start
+            break
+        if simulation.tick_counter - last_change >= settle_ticks:
+            break
+    elapsed = time.perf_counter() - start
+
+    summary = simulation.assignment_summary()
+    ticks = summary["ticks"]
+    return {
+        "scenario": scenario, "scale": num_dns, "dns": initial_dns, "pmns": len(summary["pmns"]),
+        "setup_s": setup_s, "elapsed_s": elapsed, "ticks": ticks,
+        "ticks_per_s": ticks / elapsed if elapsed > 0 else None,
+        "dns_completed": summary["dns_completed"], "dns_remaining": summary["dns_remaining"],
+        "absorbed_per_s": summary["dns_completed"] / elapsed if elapsed > 0 else None,
+        "drained": drain_ticks is not None, "drain_ticks": drain_ticks, "drain_s": drain_s,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(scenario, num_dns, seed, max_ticks, settle_ticks):
+    """
+    Run one case in a fresh spawned process so peak RSS is not inherited from earlier cases.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_scenario, scenario, num_dns, seed, max_ticks, settle_ticks).result()
+
+
+def format_result(result):
+    drain = f"{result['drain_s']:8.2f}s @ {result['drain_ticks']:<6}" if result["drained"] else f"{'not drained':>19}"
+    rss = f"{result['peak_rss_mb']:8.1f} MiB" if result["peak_rss_mb"] is not None else f"{'n/a':>12}"
+    return (
+        f"{result['scenario']:<18} {result['scale']:>7} {result['pmns']:>5} {result['ticks']:>7} "
+        f"{result['ticks_per_s']:10.1f} {result['absorbed_per_s']:12.1f} {drain} {rss}"
+    )
+
+
+def parse_scales(text):
+    return [int(float(value)) for value in text.split(",") if value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Gravitas engine on the generator scenarios")
+    parser.add_argument("--quick", action="store_true", help=f"Scales {QUICK_SCALES} only")
+    parser.add_argument("--scenarios", default=None, help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--scales", type=parse_scales, default=None, help="Comma-separated DN counts, e.g. 300,3e4")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS, help="Tick budget per case")
+    parser.add_argument("--settle-ticks", type=int, default=DEFAULT_SETTLE_TICKS, help="Stop after this many ticks without progress")
+    parser.add_argument("--output", default="scenario_results.json", help="Where to write the results (JSON)")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    scales = args.scales or (QUICK_SCALES if args.quick else SCALES)
+
+    print(f"{'scenario':<18} {'DNs':>7} {'PMNs':>5} {'ticks':>7} {'ticks/s':>10} {'absorbed/s':>12} {'time to drain':>19} {'peak RSS':>12}")
+    results = []
+    for scenario in scenarios:
+        for num_dns in scales:
+            try:
+                result = run_isolated(scenario, num_dns, args.seed, args.max_ticks, args.settle_ticks)
+            except ImportError as error:  # e.g. Pillow for image_compression
+                print(f"[Skip] {scenario}: {error}")
+                break
+            results.append(result)
+            print(format_result(result))
+
+    report = {
+        "meta": {
+            "timestamp": time.time(), "seed": args.seed, "max_ticks": args.max_ticks, "settle_ticks": args.settle_ticks,
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
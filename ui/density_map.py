@@ -0,0 +1,47 @@
+from PyQt5.QtGui import QImage
+import numpy as np
+
+LOW_COLOR = (100, 220, 220)  # Sparse cells take the DN color
+HIGH_COLOR = (255, 255, 255)  # The densest cells fade to white
+MAX_ALPHA = 230
+
+
+def density_lut():
+    """
+    256-entry RGBA color map from transparent DN color to opaque white.
+    """
+    levels = np.linspace(0, 1, 256)[:, None]
+    rgb = np.array(LOW_COLOR) * (1 - levels ** 2) + np.array(HIGH_COLOR) * levels ** 2
+    alpha = np.minimum(1, 1.5 * levels) * MAX_ALPHA
+    return np.hstack([rgb, alpha]).round().astype(np.uint8)
+
+
+DENSITY_LUT = density_lut()
+
+
+def blur(density, passes):
+    """
+    Smooth a density grid with separable [1, 2, 1] / 4 passes (zero outside the grid).
+    """
+    for _ in range(passes):
+        padded = np.pad(density, 1)
+        density = (padded[:-2, 1:-1] + 2 * padded[1:-1, 1:-1] + padded[2:, 1:-1]) / 4
+        padded = np.pad(density, 1)
+        density = (padded[1:-1, :-2] + 2 * padded[1:-1, 1:-1] + padded[1:-1, 2:]) / 4
+    return density
+
+
+def density_image(counts, blur_passes=0):
+    """
+    Color-mapped density grid as a QImage with one pixel per bin. Counts are
+    log-scaled against the densest cell so sparse regions stay visible.
+
+    :param counts: (rows, columns) counts per bin, see RenderSnapshot.density.
+    :return: QImage (Format_RGBA8888) to be drawn scaled by the bin size.
+    """
+    density = blur(counts.astype(float), blur_passes)
+    peak = density.max()
+    levels = np.log1p(density) / np.log1p(peak) if peak > 0 else density
+    rgba = np.ascontiguousarray(DENSITY_LUT[(levels * 255).astype(np.uint8)])
+    rows, columns = density.shape
+    return QImage(rgba.data, columns, rows, columns * 4, QImage.Format_RGBA8888).copy()  # Copy: rgba is freed
@@ -0,0 +1,29 @@
+from PyQt5 import sip
+from PyQt5.QtCore import QLineF
+import numpy as np
+
+
+def line_array(starts, ends):
+    """
+    Line segments as a sip.array of QLineF, the form QPainter.drawLines takes as one
+    batch. The coordinates are written straight into the array's buffer, without
+    building a Python QLineF per segment.
+
+    :param starts: (M, 2) segment start points.
+    :param ends: (M, 2) segment end points.
+    """
+    lines = sip.array(QLineF, len(starts))
+    if len(starts):
+        coordinates = np.frombuffer(memoryview(lines), dtype=np.float64).reshape(len(starts), 4)
+        coordinates[:, :2] = starts
+        coordinates[:, 2:] = ends
+    return lines
+
+
+def draw_segments(painter, pen, starts, ends):
+    """
+    Draw every (start, end) segment with one pen in a single drawLines call.
+    """
+    if len(starts):
+        painter.setPen(pen)
+        painter.drawLines(line_array(starts, ends))
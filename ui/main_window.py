@@ -1,91 +1,162 @@
 from PyQt5.QtWidgets import (
     QWidget, QMainWindow, QVBoxLayout, QPushButton, QSlider, QLabel, QHBoxLayout, QCheckBox
 )
-from PyQt5.QtGui import QPainter, QColor, QPen, QRadialGradient, QPixmap
-from PyQt5.QtCore import QTimer, Qt, QTime
+from PyQt5.QtGui import QPainter, QColor, QPen, QPixmap, QFont
+from PyQt5.QtCore import QTimer, Qt, QTime, QPointF, QRectF
 from core.node import DynamicNode, PrimaryMassNode
+from core.profiler import RateMeter
+from core.random_streams import INTERACTIVE_STREAM
+from core.render_snapshot import NO_TARGET
+from ui.sprite_cache import SpriteCache, draw_sprites, quantize, quantize_pulse, SIZE_QUANTUM
+from ui.line_batch import draw_segments
+from ui.density_map import density_image
+from ui.simulation_thread import SimulationThread
 import numpy as np
 import math
 
+FILAMENT_COLORS = [(130, 60, 100), (30, 200, 240), (255, 255, 255)]  # Far, mid and near filaments
+FILAMENT_MAX_DISTANCE = 400
+TRAIL_COLOR = (100, 220, 220)
+TRAIL_MAX_ALPHA = 160  # Alpha of the newest trail segment; older segments fade linearly
+TRAIL_WIDTH = 1.5
+PAINT_INTERVAL_MS = 16  # Paint timer, independent of the simulation tick rate
+RATE_LABEL_INTERVAL_MS = 500
+
+
+def filament_buckets(distances):
+    """
+    Index into FILAMENT_COLORS for each filament length: 2 within a third of
+    FILAMENT_MAX_DISTANCE, 1 within two thirds, 0 beyond.
+    """
+    normalized = np.clip(1 - np.asarray(distances) / FILAMENT_MAX_DISTANCE, 0, 1)
+    return (normalized > 0.33).astype(int) + (normalized > 0.66)
+
 
 class SimulationView(QWidget):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
         self.background = QPixmap("assets/icons/neural_net_background_resized.png")
+        self.show_profile_overlay = False
+        self.sprites = SpriteCache()  # Pre-rendered node glows
+        self.density_cache = (None, None)  # (snapshot, QImage) of the last density map
+        self.interpolate = False  # Blend between the two latest snapshots instead of showing the latest
+        self.paint_rate = RateMeter()  # Achieved frames per second
+
+    def current_snapshot(self):
+        """
+        Snapshot to paint: the latest published one, or one blended between the two
+        latest when interpolating. Publishes one if the simulation has not yet.
+        """
+        snapshots = self.controller.snapshots
+        snapshot = snapshots.interpolated() if self.interpolate else snapshots.latest
+        return snapshot or self.controller.publish_snapshot()
 
     def paintEvent(self, event):
+        profiler = self.controller.profiler
+        paint_start = start = profiler.start()
+        self.paint_rate.tick()
+        snapshot = self.current_snapshot()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
 
         self.draw_background(painter)
-        self.draw_filaments(painter)
-        self.draw_nodes(painter)
+        start = profiler.lap("paint.background", start)
+        if snapshot.lod:
+            self.draw_density(painter, snapshot)
+            start = profiler.lap("paint.density", start)
+        else:
+            self.draw_filaments(painter, snapshot)
+            start = profiler.lap("paint.filaments", start)
+            self.draw_trails(painter, snapshot)
+            start = profiler.lap("paint.trails", start)
+        self.draw_nodes(painter, snapshot)
+        profiler.lap("paint.nodes", start)
+        profiler.lap("paint", paint_start)
+
+        if self.show_profile_overlay:
+            self.draw_profile_overlay(painter)
+
+    def draw_profile_overlay(self, painter):
+        """
+        Rolling p50 / p95 / p99 of every profiled phase, in milliseconds, in the top-left corner.
+        """
+        lines = ["phase                     p50     p95     p99"]
+        for phase, stats in sorted(self.controller.profiler.summary().items()):
+            if stats["window"]:
+                lines.append(f"{phase:<22} {stats['p50_ms']:7.2f} {stats['p95_ms']:7.2f} {stats['p99_ms']:7.2f}")
+
+        font = QFont("Monospace", 8)
+        font.setStyleHint(QFont.TypeWriter)
+        painter.setFont(font)
+        line_height = painter.fontMetrics().height()
+        width = max(painter.fontMetrics().width(line) for line in lines) + 12
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 160))
+        painter.drawRect(4, 4, width, line_height * len(lines) + 8)
+        painter.setPen(QColor(200, 255, 200))
+        for row, line in enumerate(lines):
+            painter.drawText(10, 8 + line_height * (row + 1) - painter.fontMetrics().descent(), line)
 
     def draw_background(self, painter):
         painter.drawPixmap(self.rect(), self.background)
 
-    def draw_nodes(self, painter):
+    def draw_density(self, painter, snapshot):
+        # Level of detail for large populations: the snapshot's DN density grid as one
+        # color-mapped image, built once per snapshot and drawn in a single call
+        cached_snapshot, image = self.density_cache
+        if cached_snapshot is not snapshot:
+            image = density_image(snapshot.density, self.controller.config.lod_blur)
+            self.density_cache = (snapshot, image)
+
+        bin_size = snapshot.bin_size
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawImage(QRectF(0, 0, image.width() * bin_size, image.height() * bin_size), image)
+        painter.restore()
+
+    def draw_nodes(self, painter, snapshot):
         pulse_factor = (math.sin(QTime.currentTime().msecsSinceStartOfDay() / 500.0) + 1) / 2
 
         # Ensure PMNs are always drawn
-        for node in self.controller.nodes:
-            if isinstance(node, PrimaryMassNode):
-                self.draw_pmn(painter, node)
-
-        # Filter DNs for display
-        dn_display_limit = getattr(self.controller, "dn_display_limit", 100)
-        total_dns = [node for node in self.controller.nodes if isinstance(node, DynamicNode)]
-        num_dns_to_display = int(len(total_dns) * dn_display_limit / 100)
-        displayed_dns = sorted(total_dns, key=lambda dn: dn.mass, reverse=True)[:num_dns_to_display]
-
-        # Draw only the filtered DNs
-        for node in displayed_dns:
-            size = max(5, node.mass * 4) / 4
-            glow_gradient = QRadialGradient(node.position[0], node.position[1], size * 4)
-            glow_gradient.setColorAt(0.0, QColor(100, 220, 220, int((150 + pulse_factor * 50) * 0.33)))
-            glow_gradient.setColorAt(1.0, QColor(100, 220, 220, 0))
-
-            painter.setBrush(glow_gradient)
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(
-                int(node.position[0] - size * 2),
-                int(node.position[1] - size * 2),
-                size * 4, size * 4
-            )
-
-            painter.setBrush(QColor(100, 220, 220))
-            painter.drawEllipse(int(node.position[0] - size / 2), int(node.position[1] - size / 2), size, size)
-
-
-    def draw_filaments(self, painter):
-        # Fetch the display limit for DNs
-        dn_display_limit = getattr(self.controller, "dn_display_limit", 100)
-        total_dns = [node for node in self.controller.nodes if isinstance(node, DynamicNode)]
-        num_dns_to_display = int(len(total_dns) * dn_display_limit / 100)
-
-        # Filter displayed DNs
-        displayed_dns = sorted(total_dns, key=lambda dn: dn.mass, reverse=True)[:num_dns_to_display]
-
-        # Draw filaments only for displayed DNs
-        for node in displayed_dns:
-            closest_pmn = self.find_closest_pmn(node)
-            if closest_pmn:
-                r_vector = closest_pmn.position - node.position
-                distance = np.linalg.norm(r_vector)
-
-                color = self.get_filament_gradient_color(distance)
-                pulse_opacity = int(150 + 100 * np.sin(QTime.currentTime().msecsSinceStartOfDay() / 300.0))
-
-                glow_pen = QPen(QColor(color.red(), color.green(), color.blue(), pulse_opacity))
-                glow_pen.setWidth(3)
-                painter.setPen(glow_pen)
-                painter.drawLine(
-                    int(node.position[0]),
-                    int(node.position[1]),
-                    int(closest_pmn.position[0]),
-                    int(closest_pmn.position[1])
-                )
+        for position, capacity in zip(snapshot.pmn_positions.tolist(), snapshot.pmn_capacities.tolist()):
+            self.draw_pmn(painter, position, capacity)
+
+        # Draw only the displayed DNs, one drawPixmapFragments call per sprite size
+        glow_alpha = int((150 + quantize_pulse(pulse_factor) * 50) * 0.33)
+        positions = snapshot.dn_positions[snapshot.display]
+        sizes = quantize(np.maximum(5, snapshot.dn_masses[snapshot.display] * 4) / 4, SIZE_QUANTUM)
+        unique_sizes, size_index = np.unique(sizes, return_inverse=True)
+        order = np.argsort(size_index, kind="stable")
+        for size, group in zip(unique_sizes.tolist(), np.split(order, np.cumsum(np.bincount(size_index))[:-1])):
+            sprite = self.sprites.glow(size * 2, size * 4, size / 2, (100, 220, 220), glow_alpha)
+            draw_sprites(painter, sprite, positions[group].tolist())
+
+
+    def draw_filaments(self, painter, snapshot):
+        # Draw filaments only for displayed DNs, to the nearest PMN found by the simulation:
+        # one pulse opacity per frame and one drawLines call per color
+        pulse_opacity = int(150 + 100 * np.sin(QTime.currentTime().msecsSinceStartOfDay() / 300.0))
+        has_target = snapshot.filament_targets != NO_TARGET
+        starts = snapshot.dn_positions[snapshot.display[has_target]]
+        ends = snapshot.pmn_positions[snapshot.filament_targets[has_target]]
+        buckets = filament_buckets(snapshot.filament_distances[has_target])
+        for bucket, color in enumerate(FILAMENT_COLORS):
+            selected = buckets == bucket
+            glow_pen = QPen(QColor(*color, pulse_opacity))
+            glow_pen.setWidth(3)
+            draw_segments(painter, glow_pen, starts[selected], ends[selected])
+
+    def draw_trails(self, painter, snapshot):
+        # One drawLines call per segment age, fading out towards the oldest segment
+        points, counts = snapshot.trail_points, snapshot.trail_counts
+        length = points.shape[1]
+        for segment in range(length - 1):
+            valid = counts >= length - segment  # Both end points of the segment are recorded
+            trail_pen = QPen(QColor(*TRAIL_COLOR, int(TRAIL_MAX_ALPHA * (segment + 1) / (length - 1))))
+            trail_pen.setWidthF(TRAIL_WIDTH)
+            trail_pen.setCapStyle(Qt.FlatCap)
+            draw_segments(painter, trail_pen, points[valid, segment], points[valid, segment + 1])
 
 
     def get_heatmap_gradient_color(self, distance):
@@ -105,62 +176,24 @@ class SimulationView(QWidget):
         return QColor(r, g, b)
     
     def get_filament_gradient_color(self, distance):
-        max_distance = 400
-        normalized = max(0, min(1, 1 - distance / max_distance))
-        
-        # Define the custom purplish hue (sampled from the background and brightened)
-        accent_color = QColor(130,60,100)  # Adjusted to blend beautifully
-
-        if normalized > 0.66:
-            #r, g, b = 255, int(255 * (1 - normalized) * 3), int(255 * (1 - normalized) * 3)
-            # Mid intensity: White
-            r, g, b = 255, 255, 255
-        elif normalized > 0.33:
-            r, g, b = 30,200,240
-        else:
-            # Low intensity: Blue to White
-            r, g, b = accent_color.red(), accent_color.green(), accent_color.blue()
-
-        return QColor(r, g, b)
+        # Near: white, mid: cyan, far: the purplish accent sampled from the background
+        return QColor(*FILAMENT_COLORS[int(filament_buckets(distance))])
 
 
 
-    def find_closest_pmn(self, dynamic_node):
-        pmns = [n for n in self.controller.nodes if isinstance(n, PrimaryMassNode)]
-        if not pmns:
-            return None
-        return min(pmns, key=lambda pmn: np.linalg.norm(pmn.position - dynamic_node.position))
-
-    def draw_pmn(self, painter, pmn):
+    def draw_pmn(self, painter, position, processing_capacity):
         # Set a base size for the PMN
         base_size = 40
         max_size_increase = 20  # Limit the maximum size increase
-        size = base_size + int(min(pmn.processing_capacity, 1.0) * max_size_increase)
+        size = base_size + int(min(processing_capacity, 1.0) * max_size_increase)
 
         # Clamp the processing capacity between 0.0 and 1.0
-        capacity = max(0.0, min(1.0, pmn.processing_capacity))
+        capacity = max(0.0, min(1.0, processing_capacity))
         color = self.get_heatmap_gradient_color(capacity * 400)  # Use 400 as a max pseudo-distance
 
-        # Draw the glow effect
-        glow_gradient = QRadialGradient(pmn.position[0], pmn.position[1], size * 2)
-        glow_gradient.setColorAt(0.0, QColor(color.red(), color.green(), color.blue(), 200))
-        glow_gradient.setColorAt(1.0, QColor(color.red(), color.green(), color.blue(), 0))
-
-        painter.setBrush(glow_gradient)
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(
-            int(pmn.position[0] - size),
-            int(pmn.position[1] - size),
-            size * 2, size * 2
-        )
-
-        # Draw the PMN itself
-        painter.setBrush(QColor(color.red(), color.green(), color.blue()))
-        painter.drawEllipse(
-            int(pmn.position[0] - base_size / 2),
-            int(pmn.position[1] - base_size / 2),
-            base_size, base_size
-        )
+        # Draw the glow effect and the PMN itself from one cached sprite
+        sprite = self.sprites.glow(size, size * 2, base_size / 2, (color.red(), color.green(), color.blue()), 200)
+        painter.drawPixmap(QPointF(position[0] - sprite.width() / 2, position[1] - sprite.height() / 2), sprite)
 
 
 
@@ -168,14 +201,21 @@ class MainWindow(QMainWindow):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
+        self.controller.publish_snapshots = True  # The view paints from the per-tick RenderSnapshot
         self.setWindowTitle("SoL Gravitas Recommendation Engine Protocol (GREP)")
         self.setGeometry(100, 100, 800, 600)
 
+        # The simulation steps on its own thread at config tick_rate; the timer only repaints
+        self.simulation_thread = SimulationThread(self.controller, self)
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.controller.update)
 
         self.apply_dark_theme()
         self.initUI()
+        self.timer.timeout.connect(self.simulation_view.update)
+
+        self.rate_timer = QTimer(self)
+        self.rate_timer.timeout.connect(self.update_rate_label)
+        self.rate_timer.start(RATE_LABEL_INTERVAL_MS)
 
     def apply_dark_theme(self):
         self.setStyleSheet("""
@@ -225,10 +265,25 @@ class MainWindow(QMainWindow):
         control_layout.addWidget(self.dn_display_slider)
 
 
+        self.interpolate_checkbox = QCheckBox("Interpolate")
+        self.interpolate_checkbox.setChecked(False)
+        self.interpolate_checkbox.stateChanged.connect(self.toggle_interpolation)
+        control_layout.addWidget(self.interpolate_checkbox)
+
+        self.profile_checkbox = QCheckBox("Show Profiler")
+        self.profile_checkbox.setChecked(False)
+        self.profile_checkbox.stateChanged.connect(self.toggle_profiler)
+        control_layout.addWidget(self.profile_checkbox)
+
         start_button = QPushButton("Start Simulation")
         start_button.clicked.connect(self.start_simulation)
         control_layout.addWidget(start_button)
 
+        self.rate_label = QLabel()
+        self.rate_label.setStyleSheet("color: #C8FFC8;")
+        control_layout.addWidget(self.rate_label)
+        self.update_rate_label()
+
         control_panel.setLayout(control_layout)
         main_layout.addWidget(control_panel, stretch=1)
 
@@ -241,14 +296,37 @@ class MainWindow(QMainWindow):
     def update_dn_display_limit(self):
         # Update the controller with the new display limit
         self.controller.dn_display_limit = self.dn_display_slider.value()
+        self.controller.publish_snapshot()
+        self.simulation_view.update()
 
     def start_simulation(self):
-        self.timer.start(50)
+        self.simulation_thread.start()
+        self.timer.start(PAINT_INTERVAL_MS)
         self.simulation_view.update()
 
+    def update_rate_label(self):
+        sim_rate = self.simulation_thread.worker.rate.rate()
+        paint_rate = self.simulation_view.paint_rate.rate()
+        self.rate_label.setText(f"Sim {sim_rate:.0f} Hz | Paint {paint_rate:.0f} FPS")
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.simulation_thread.stop()
+        super().closeEvent(event)
+
+    def toggle_interpolation(self, state):
+        self.simulation_view.interpolate = state == Qt.Checked
+
     def toggle_dn_collisions(self, state):
         self.controller.enable_dn_collisions = state == Qt.Checked
 
+    def toggle_profiler(self, state):
+        # The overlay needs timings, so showing it also turns the profiler on
+        enabled = state == Qt.Checked
+        self.controller.profiler.enabled = enabled or self.controller.config.profiling_enabled
+        self.simulation_view.show_profile_overlay = enabled
+        self.simulation_view.update()
+
     def update_node_masses(self):
         dn_mass = self.mass_slider.value() / 10
         pmn_mass = self.mass_slider.value() * 2
@@ -260,26 +338,27 @@ class MainWindow(QMainWindow):
                 node.mass = pmn_mass
                 
     def add_dynamic_node(self):
-        mass = np.random.uniform(0.5, 5.0)  # Randomized mass
-        position = np.random.uniform(
+        rng = self.controller.random.generator(INTERACTIVE_STREAM)
+        mass = rng.uniform(0.5, 5.0)  # Randomized mass
+        position = rng.uniform(
             [100, 100], 
             [self.simulation_view.width(), self.simulation_view.height()]
         )
-        velocity_vector = (np.random.rand(2) - 0.5) * 2  # Random velocity
+        velocity_vector = (rng.random(2) - 0.5) * 2  # Random velocity
 
-        new_node = DynamicNode(mass=self.mass_slider.value(), position=position, velocity=velocity_vector)
-        self.controller.nodes.append(new_node)  # Add to simulation controller
+        new_node = DynamicNode(mass=self.mass_slider.value(), position=position, velocity=velocity_vector, rng=rng)
+        self.controller.add_node(new_node)  # Add to simulation controller
         self.simulation_view.update()  # Refresh the UI
         
     def add_primary_mass_node(self):
         mass = self.mass_slider.value() * 5
-        position = np.random.uniform(
+        position = self.controller.random.generator(INTERACTIVE_STREAM).uniform(
             [100, 100],
             [self.simulation_view.width(), self.simulation_view.height()]
         )
 
         new_node = PrimaryMassNode(mass=mass, position=position, velocity=np.zeros(2))
-        self.controller.nodes.append(new_node)
+        self.controller.add_node(new_node)
         self.simulation_view.update()
         
     def update_node_masses(self):
@@ -0,0 +1,27 @@
+from PyQt5.QtCore import QThread
+from core.simulation_worker import SimulationWorker
+
+
+class SimulationThread(QThread):
+    def __init__(self, controller, parent=None):
+        """
+        QThread running a SimulationWorker, so physics and processing never block input
+        or painting. The view paints controller.snapshots on its own timer.
+        """
+        super().__init__(parent)
+        self.worker = SimulationWorker(controller)
+
+    def run(self):
+        self.worker.run()
+
+    def start(self):
+        if not self.isRunning():
+            self.worker.stopping.clear()
+            super().start()
+
+    def stop(self):
+        """
+        Stop after the current tick and wait for the thread to finish.
+        """
+        self.worker.stopping.set()
+        self.wait()
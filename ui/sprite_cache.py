@@ -0,0 +1,98 @@
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QRadialGradient
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from collections import OrderedDict
+import numpy as np
+import math
+
+DEFAULT_MAX_SPRITES = 256
+SIZE_QUANTUM = 0.25  # Node sizes are rounded to this many pixels before a sprite is looked up
+PULSE_LEVELS = 16  # Distinct pulse phases, so a pulsing glow cycles through at most this many sprites
+
+
+def quantize(values, quantum):
+    """
+    Round a value or array to a multiple of quantum.
+    """
+    return np.round(np.asarray(values) / quantum) * quantum
+
+
+def quantize_pulse(pulse_factor):
+    """
+    Snap a pulse factor in [0, 1] to one of PULSE_LEVELS phases.
+    """
+    return round(pulse_factor * (PULSE_LEVELS - 1)) / (PULSE_LEVELS - 1)
+
+
+def render_glow(radius, gradient_radius, core_radius, color, glow_alpha):
+    """
+    Pre-render a glowing node: a radial-gradient halo of the given radius, fading from
+    glow_alpha at the center to 0 at gradient_radius, under a solid core.
+
+    :param color: (r, g, b) tuple.
+    :return: Transparent QPixmap with the node at its center.
+    """
+    side = 2 * math.ceil(max(radius, core_radius)) + 2
+    pixmap = QPixmap(side, side)
+    pixmap.fill(Qt.transparent)
+    center = QPointF(side / 2, side / 2)
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    gradient = QRadialGradient(center, gradient_radius)
+    gradient.setColorAt(0.0, QColor(*color, glow_alpha))
+    gradient.setColorAt(1.0, QColor(*color, 0))
+    painter.setBrush(gradient)
+    painter.drawEllipse(center, radius, radius)
+    painter.setBrush(QColor(*color))
+    painter.drawEllipse(center, core_radius, core_radius)
+    painter.end()
+    return pixmap
+
+
+class SpriteCache:
+    def __init__(self, max_sprites=DEFAULT_MAX_SPRITES):
+        """
+        Least-recently-used cache of pre-rendered glow sprites, keyed by radii, color
+        and glow alpha. Callers quantize sizes and pulse phases so the key space stays small.
+
+        :param max_sprites: Sprites kept before the least recently used one is evicted.
+        """
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()  # Key -> QPixmap, least recently used first
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def glow(self, radius, gradient_radius, core_radius, color, glow_alpha):
+        """
+        Sprite for a glowing node, rendered on first use.
+
+        :param color: (r, g, b) tuple.
+        :return: QPixmap with the node at its center.
+        """
+        key = (float(radius), float(gradient_radius), float(core_radius), tuple(color), int(glow_alpha))
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+
+        sprite = self.sprites[key] = render_glow(*key)
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+
+def draw_sprites(painter, sprite, positions):
+    """
+    Draw one sprite centered on each position with a single drawPixmapFragments call.
+
+    :param positions: Sequence of (x, y) centers.
+    """
+    source = QRectF(sprite.rect())
+    fragments = [QPainter.PixmapFragment.create(QPointF(x, y), source) for x, y in positions]
+    if fragments:
+        painter.drawPixmapFragments(fragments, sprite)